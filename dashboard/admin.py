@@ -1,50 +1,100 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import BooleanField, Case, F, Value, When
+from django.db.models.functions import Now
+from django.utils.functional import cached_property
 from django.utils.html import format_html
 
+import json
+
+from .cache import sql_memo
+from .constants import AuditAction, MaterialStatus, Platform, ProjectStatus, UserRole
 from .models import (
-    User, Project, Material, MaterialVersion, Approval, 
+    User, Project, Material, MaterialVersion, Approval,
     PlatformSpec, DriveLink, AuditLog
 )
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
     """Admin personalizado para usuarios."""
-    list_display = ['username', 'email', 'first_name', 'last_name', 'role', 'company', 'is_active', 'date_joined']
+    list_display = ['username', 'email', 'first_name', 'last_name', 'role_display', 'company', 'is_active', 'date_joined']
     list_filter = ['role', 'is_active', 'is_staff', 'date_joined']
     search_fields = ['username', 'email', 'first_name', 'last_name', 'company']
     ordering = ['-date_joined']
-    
+
     fieldsets = BaseUserAdmin.fieldsets + (
         ('Información adicional', {'fields': ('role', 'phone', 'company')}),
     )
 
+    def role_display(self, obj):
+        return UserRole.DISPLAY.get(obj.role, obj.role)
+    role_display.short_description = 'Rol'
+    role_display.admin_order_field = 'role'
+
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
     """Admin para proyectos."""
-    list_display = ['name', 'company', 'app_name', 'status', 'created_by', 'created_at', 'is_overdue']
+    list_display = ['name', 'company', 'app_name', 'status_display', 'created_by', 'created_at', 'is_overdue']
     list_filter = ['status', 'company', 'created_at', 'deadline']
     search_fields = ['name', 'app_name', 'company', 'description']
     readonly_fields = ['created_at', 'updated_at', 'completion_percentage']
-    filter_horizontal = ['assigned_reviewers']
-    
+    autocomplete_fields = ['assigned_reviewers']
+    raw_id_fields = ['created_by']
+    list_select_related = ['created_by']
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        qs = qs.annotate(
+            _overdue=Case(
+                When(deadline__lt=Now(), then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            )
+        )
+        return qs.with_completion().prefetch_related('assigned_reviewers')
+
     def is_overdue(self, obj):
-        if obj.is_overdue:
+        if obj._overdue:
             return format_html('<span style="color: red;">⚠️ Atrasado</span>')
         return format_html('<span style="color: green;">✅ En tiempo</span>')
     is_overdue.short_description = 'Estado de plazo'
+    is_overdue.admin_order_field = '_overdue'
+
+    def status_display(self, obj):
+        return ProjectStatus.DISPLAY.get(obj.status, obj.status)
+    status_display.short_description = 'Estado'
+    status_display.admin_order_field = 'status'
 
 @admin.register(Material)
 class MaterialAdmin(admin.ModelAdmin):
     """Admin para materiales."""
-    list_display = ['file_name', 'project', 'platform', 'asset_key', 'status', 'file_size_mb', 'uploaded_by', 'created_at']
+    list_display = ['file_name', 'project', 'platform_display', 'asset_key', 'status_display', 'file_size_mb', 'uploaded_by', 'created_at']
     list_filter = ['status', 'platform', 'material_type', 'has_transparency', 'created_at']
     search_fields = ['file_name', 'asset_key', 'project__name', 'project__app_name']
-    readonly_fields = ['file_hash', 'created_at', 'updated_at', 'file_size_mb']
-    
+    readonly_fields = ['hash_hex', 'created_at', 'updated_at', 'file_size_mb']
+    raw_id_fields = ['project', 'uploaded_by']
+    list_select_related = ['project', 'uploaded_by']
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_mb=F('file_size') / Value(1048576.0))
+
     def file_size_mb(self, obj):
-        return f"{obj.file_size_mb} MB"
+        return f"{obj._mb:.2f} MB"
     file_size_mb.short_description = 'Tamaño'
+    file_size_mb.admin_order_field = '_mb'
+
+    def platform_display(self, obj):
+        return Platform.DISPLAY.get(obj.platform, obj.platform)
+    platform_display.short_description = 'Plataforma'
+    platform_display.admin_order_field = 'platform'
+
+    def status_display(self, obj):
+        return MaterialStatus.DISPLAY.get(obj.status, obj.status)
+    status_display.short_description = 'Estado'
+    status_display.admin_order_field = 'status'
 
 @admin.register(MaterialVersion)
 class MaterialVersionAdmin(admin.ModelAdmin):
@@ -53,27 +103,45 @@ class MaterialVersionAdmin(admin.ModelAdmin):
     list_filter = ['created_at', 'material__platform']
     search_fields = ['file_name', 'material__file_name', 'change_description']
     readonly_fields = ['created_at', 'file_size_mb']
-    
+    raw_id_fields = ['material', 'created_by']
+    list_select_related = ['material', 'material__project', 'created_by']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_mb=F('file_size') / Value(1048576.0))
+
     def file_size_mb(self, obj):
-        return f"{obj.file_size_mb} MB"
+        return f"{obj._mb:.2f} MB"
     file_size_mb.short_description = 'Tamaño'
+    file_size_mb.admin_order_field = '_mb'
 
 @admin.register(Approval)
 class ApprovalAdmin(admin.ModelAdmin):
     """Admin para aprobaciones."""
-    list_display = ['material', 'reviewer', 'status', 'approved_at', 'created_at']
+    list_display = ['material', 'reviewer', 'status_display', 'approved_at', 'created_at']
     list_filter = ['status', 'created_at', 'approved_at']
     search_fields = ['material__file_name', 'reviewer__username', 'comments']
     readonly_fields = ['created_at', 'updated_at', 'approved_at']
+    raw_id_fields = ['material', 'reviewer']
+    list_select_related = ['material', 'material__project', 'reviewer']
+
+    def status_display(self, obj):
+        return MaterialStatus.DISPLAY.get(obj.status, obj.status)
+    status_display.short_description = 'Estado'
+    status_display.admin_order_field = 'status'
 
 @admin.register(PlatformSpec)
 class PlatformSpecAdmin(admin.ModelAdmin):
     """Admin para especificaciones de plataforma."""
-    list_display = ['platform', 'asset_key', 'is_active', 'created_at']
+    list_display = ['platform_display', 'asset_key', 'is_active', 'created_at']
     list_filter = ['platform', 'is_active', 'created_at']
     search_fields = ['platform', 'asset_key']
     readonly_fields = ['created_at', 'updated_at']
 
+    def platform_display(self, obj):
+        return Platform.DISPLAY.get(obj.platform, obj.platform)
+    platform_display.short_description = 'Plataforma'
+    platform_display.admin_order_field = 'platform'
+
 @admin.register(DriveLink)
 class DriveLinkAdmin(admin.ModelAdmin):
     """Admin para enlaces de Drive."""
@@ -81,15 +149,75 @@ class DriveLinkAdmin(admin.ModelAdmin):
     list_filter = ['created_at', 'project']
     search_fields = ['folder_path', 'project__name', 'material__file_name']
     readonly_fields = ['created_at', 'updated_at']
+    raw_id_fields = ['project', 'material']
+    list_select_related = ['project', 'material']
+
+class NoCountPaginator(Paginator):
+    """Paginador que evita el SELECT count(*) en tablas grandes.
+
+    Reporta un total fijo alto en lugar de contar filas; suficiente para
+    paginar hacia adelante en listados de solo lectura.
+    """
+    @cached_property
+    def count(self):
+        return 9999999999
+
+class CachedEntityTypeFilter(admin.SimpleListFilter):
+    """Filtro por tipo de entidad con lookups cacheados.
+
+    El filtro por defecto ejecuta SELECT DISTINCT entity_type en cada carga
+    de página; aquí el resultado se cachea durante una hora.
+    """
+    title = 'Tipo de entidad'
+    parameter_name = 'entity_type'
+
+    def lookups(self, request, model_admin):
+        entity_types = cache.get('auditlog:entity_types')
+        if entity_types is None:
+            entity_types = list(
+                AuditLog.objects.values_list('entity_type', flat=True).distinct()
+            )
+            cache.set('auditlog:entity_types', entity_types, 3600)
+        return [(et, et) for et in entity_types]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(entity_type=self.value())
+        return queryset
+
+@sql_memo(table='admin_derived')
+def _render_payload(pk, payload_json):
+    """Renderiza el payload del log con sangría; memoizado en disco.
+
+    Los logs son inmutables, así que la clave (pk, payload) nunca necesita
+    invalidarse.
+    """
+    if not payload_json:
+        return '-'
+    return json.dumps(json.loads(payload_json), indent=2, ensure_ascii=False, sort_keys=True)
 
 @admin.register(AuditLog)
 class AuditLogAdmin(admin.ModelAdmin):
     """Admin para logs de auditoría."""
-    list_display = ['actor', 'action', 'entity_type', 'entity_id', 'created_at']
-    list_filter = ['action', 'entity_type', 'created_at', 'actor']
+    list_display = ['actor', 'action_display', 'entity_type', 'entity_id', 'created_at']
+    list_filter = ['action', CachedEntityTypeFilter, 'created_at', ('actor', admin.RelatedOnlyFieldListFilter)]
     search_fields = ['actor__username', 'entity_type', 'payload']
-    readonly_fields = ['created_at']
-    
+    readonly_fields = ['payload_preview', 'created_at']
+
+    def payload_preview(self, obj):
+        rendered = _render_payload(obj.pk, json.dumps(obj.payload) if obj.payload else '')
+        return format_html('<pre>{}</pre>', rendered)
+    payload_preview.short_description = 'Payload'
+    raw_id_fields = ['actor']
+    list_select_related = ['actor']
+    show_full_result_count = False
+    paginator = NoCountPaginator
+
+    def action_display(self, obj):
+        return AuditAction.DISPLAY.get(obj.action, obj.action)
+    action_display.short_description = 'Acción'
+    action_display.admin_order_field = 'action'
+
     def has_add_permission(self, request):
         return False
     
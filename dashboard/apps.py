@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dashboard'
+
+    def ready(self):
+        from django.conf import settings
+
+        from . import audit
+
+        # Arrancar el hilo escritor de auditoría desde el inicio para que
+        # el primer request no pague el costo de crearlo (innecesario en
+        # modo síncrono o cuando escribe un worker de Celery).
+        if not getattr(settings, 'AUDIT_LOG_SYNC', False) and \
+                not getattr(settings, 'AUDIT_LOG_USE_CELERY', False):
+            audit.start_worker()
@@ -0,0 +1,106 @@
+"""
+Escritura por lotes del log de auditoría.
+
+Cada acción auditada se encola en memoria y un hilo de fondo las inserta
+en lotes con bulk_create, de modo que el request no paga un INSERT por
+acción. Con AUDIT_LOG_SYNC=True la escritura vuelve a ser síncrona
+(útil en tests y entornos donde no puede perderse ningún evento).
+"""
+
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+# Tiempo máximo de espera antes de volcar un lote incompleto
+FLUSH_INTERVAL_SECONDS = 0.25
+
+_queue = queue.SimpleQueue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def log(action, actor, entity_type, entity_id, payload=None,
+        ip_address=None, user_agent=None):
+    """Registra una entrada de auditoría, por defecto de forma asíncrona."""
+    entry = {
+        'action': action,
+        'actor_id': getattr(actor, 'pk', actor),
+        'entity_type': entity_type,
+        'entity_id': entity_id,
+        'payload': payload,
+        'ip_address': ip_address,
+        'user_agent': user_agent,
+    }
+    # on_commit saca la escritura del camino crítico del request y evita
+    # auditar trabajo que termine en rollback; fuera de una transacción
+    # se ejecuta inmediatamente.
+    if getattr(settings, 'AUDIT_LOG_SYNC', False):
+        transaction.on_commit(lambda: _write_batch([entry]))
+        return
+    if getattr(settings, 'AUDIT_LOG_USE_CELERY', False):
+        # Delegar el INSERT a un worker de Celery (cola dedicada 'audit')
+        from .tasks import write_audit
+        transaction.on_commit(lambda: write_audit.delay([entry]))
+        return
+    start_worker()
+    transaction.on_commit(lambda: _queue.put(entry))
+
+
+def flush():
+    """Vuelca sincrónicamente lo pendiente en la cola (para tests/shutdown)."""
+    entries = []
+    while True:
+        try:
+            entries.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    if entries:
+        _write_batch(entries)
+
+
+def _write_batch(entries):
+    from .models import AuditLog
+    with transaction.atomic():
+        AuditLog.objects.bulk_create(
+            [AuditLog(**entry) for entry in entries],
+            batch_size=BATCH_SIZE,
+        )
+
+
+def start_worker():
+    """Arranca el hilo escritor si no está corriendo (idempotente).
+
+    Se invoca desde AppConfig.ready() al iniciar el proceso y como
+    resguardo en cada log() por si el hilo murió.
+    """
+    global _worker
+    if _worker is not None and _worker.is_alive():
+        return
+    with _worker_lock:
+        if _worker is not None and _worker.is_alive():
+            return
+        _worker = threading.Thread(
+            target=_drain_forever, name='audit-log-writer', daemon=True
+        )
+        _worker.start()
+
+
+def _drain_forever():
+    while True:
+        batch = [_queue.get()]
+        # Acumular lo que llegue durante la ventana de flush
+        try:
+            while len(batch) < BATCH_SIZE:
+                batch.append(_queue.get(timeout=FLUSH_INTERVAL_SECONDS))
+        except queue.Empty:
+            pass
+        try:
+            _write_batch(batch)
+        except Exception:
+            logger.exception("Error escribiendo lote de auditoría (%d entradas)", len(batch))
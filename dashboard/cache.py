@@ -0,0 +1,105 @@
+"""
+Memoización persistente en disco para cálculos derivados del admin.
+
+Los resultados de funciones puras sobre datos de fila (renderizados de
+payload, formateos costosos) se guardan en un SQLite local, de modo que
+sobreviven reinicios de proceso. La clave incluye los argumentos, por lo
+que basta con pasar ``updated_at``/``created_at`` en la llamada para que
+la invalidación sea automática al editarse la fila.
+"""
+
+import functools
+import hashlib
+import pickle
+import sqlite3
+import threading
+
+from django.conf import settings
+from django.core.cache import cache as django_cache
+
+# Incrementar al cambiar el formato de algún resultado memoizado:
+# purga todas las entradas anteriores al arrancar.
+CACHE_VERSION = 1
+
+_lock = threading.Lock()
+_connections = {}
+
+
+def _get_connection(table):
+    """Conexión perezosa al archivo de caché, una por tabla."""
+    conn = _connections.get(table)
+    if conn is None:
+        path = settings.BASE_DIR / 'cache.sqlite'
+        conn = sqlite3.connect(str(path), check_same_thread=False)
+        conn.execute(
+            f'CREATE TABLE IF NOT EXISTS {table} '
+            '(key TEXT PRIMARY KEY, version INTEGER, value BLOB)'
+        )
+        conn.execute(f'DELETE FROM {table} WHERE version != ?', (CACHE_VERSION,))
+        conn.commit()
+        _connections[table] = conn
+    return conn
+
+
+def sql_memo(table='admin_derived'):
+    """Decorador de memoización respaldada por SQLite.
+
+    Los argumentos deben ser picklables y determinar por completo el
+    resultado (funciones puras). La clave es el SHA-1 del nombre de la
+    función más sus argumentos serializados.
+    """
+    def decorator(func):
+        qualname = f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            raw = pickle.dumps((qualname, args, kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+            key = hashlib.sha1(raw).hexdigest()
+            with _lock:
+                conn = _get_connection(table)
+                row = conn.execute(
+                    f'SELECT value FROM {table} WHERE key = ?', (key,)
+                ).fetchone()
+            if row is not None:
+                return pickle.loads(row[0])
+            result = func(*args, **kwargs)
+            with _lock:
+                conn.execute(
+                    f'INSERT OR REPLACE INTO {table} (key, version, value) VALUES (?, ?, ?)',
+                    (key, CACHE_VERSION, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)),
+                )
+                conn.commit()
+            return result
+
+        return wrapper
+    return decorator
+
+
+# ------------------------------------------------------------------
+# Versionado del caché de estadísticas del dashboard
+# ------------------------------------------------------------------
+
+_STATS_VERSION_KEY = 'dashboard_stats:version'
+
+
+def dashboard_stats_version():
+    """Versión vigente del caché de estadísticas (entra en la clave)."""
+    version = django_cache.get(_STATS_VERSION_KEY)
+    if version is None:
+        # add() no pisa un incr() concurrente de otro proceso
+        django_cache.add(_STATS_VERSION_KEY, 1, None)
+        version = django_cache.get(_STATS_VERSION_KEY, 1)
+    return version
+
+
+def invalidate_dashboard_stats():
+    """Invalida las estadísticas cacheadas de todos los usuarios.
+
+    En lugar de enumerar las claves afectadas (una por usuario y rol),
+    incrementa el contador de versión que forma parte de cada clave: las
+    entradas viejas dejan de consultarse y expiran solas por TTL.
+    """
+    try:
+        django_cache.incr(_STATS_VERSION_KEY)
+    except ValueError:
+        django_cache.set(_STATS_VERSION_KEY, 2, None)
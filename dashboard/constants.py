@@ -2,6 +2,10 @@
 Constantes y especificaciones de plataforma para el sistema de gestión de materiales.
 """
 
+import sys
+from functools import lru_cache
+from types import MappingProxyType
+
 # Roles de usuario
 class UserRole:
     ADMIN = 'admin'
@@ -13,6 +17,7 @@ class UserRole:
         (REVIEWER, 'Revisor'),
         (CLIENT, 'Cliente'),
     ]
+    DISPLAY = dict(CHOICES)
 
 # Tipos de material
 class MaterialType:
@@ -23,6 +28,7 @@ class MaterialType:
         (DOCUMENT, 'Documento'),
         (IMAGE, 'Imagen'),
     ]
+    DISPLAY = dict(CHOICES)
 
 # Estados de material
 class MaterialStatus:
@@ -37,6 +43,7 @@ class MaterialStatus:
         (APPROVED, 'Aprobado'),
         (NEEDS_CORRECTION, 'Necesita Corrección'),
     ]
+    DISPLAY = dict(CHOICES)
 
 # Plataformas soportadas
 class Platform:
@@ -55,6 +62,7 @@ class Platform:
         (AMAZON_APPSTORE, 'Amazon Appstore'),
         (IOS_TVOS_APP_STORE, 'iOS/tvOS App Store'),
     ]
+    DISPLAY = dict(CHOICES)
 
 # Especificaciones de plataforma - Source of Truth
 PLATFORM_SPECS = {
@@ -240,6 +248,25 @@ PLATFORM_SPECS = {
     },
 }
 
+# Congelar las especificaciones: son Source of Truth y no deben mutarse.
+# Las claves se internan para que los lookups del hot path de validación
+# comparen por identidad.
+PLATFORM_SPECS = MappingProxyType({
+    sys.intern(_platform): MappingProxyType({
+        sys.intern(_asset_key): MappingProxyType(_spec)
+        for _asset_key, _spec in _assets.items()
+    })
+    for _platform, _assets in PLATFORM_SPECS.items()
+})
+
+@lru_cache(maxsize=None)
+def get_spec(platform, asset_key):
+    """Resuelve la especificación de un asset evitando recorrer dicts anidados."""
+    assets = PLATFORM_SPECS.get(platform)
+    if assets is None:
+        return None
+    return assets.get(asset_key)
+
 # Estados de proyecto
 class ProjectStatus:
     DRAFT = 'draft'
@@ -253,6 +280,7 @@ class ProjectStatus:
         (COMPLETED, 'Completado'),
         (CANCELLED, 'Cancelado'),
     ]
+    DISPLAY = dict(CHOICES)
 
 # Tipos de acción en audit log
 class AuditAction:
@@ -275,3 +303,4 @@ class AuditAction:
         (DOWNLOAD, 'Descargar'),
         (SYNC_DRIVE, 'Sincronizar Drive'),
     ]
+    DISPLAY = dict(CHOICES)
@@ -0,0 +1,55 @@
+"""
+Comando para exportar materiales a CSV en streaming.
+"""
+
+import csv
+
+from django.core.management.base import BaseCommand
+
+from dashboard.models import Material
+
+class Command(BaseCommand):
+    help = 'Exporta materiales a CSV sin cargar la tabla completa en memoria'
+
+    COLUMNS = [
+        'id', 'project_id', 'platform', 'asset_key', 'file_name',
+        'file_size', 'status', 'created_at',
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default='-',
+            help='Ruta del archivo CSV (por defecto stdout)',
+        )
+        parser.add_argument(
+            '--status',
+            help='Filtrar por estado del material',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Material.objects.order_by('id')
+        if options['status']:
+            queryset = queryset.filter(status=options['status'])
+
+        out = (
+            self.stdout if options['output'] == '-'
+            else open(options['output'], 'w', newline='')
+        )
+        try:
+            writer = csv.writer(out)
+            writer.writerow(self.COLUMNS)
+
+            # iterator(): en Postgres usa un cursor del lado del servidor;
+            # las filas llegan en bloques de 500 y el ORM no las cachea,
+            # así que la memoria no crece con el tamaño de la tabla
+            count = 0
+            rows = queryset.values_list(*self.COLUMNS).iterator(chunk_size=500)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        finally:
+            if out is not self.stdout:
+                out.close()
+
+        self.stdout.write(self.style.SUCCESS(f'{count} materiales exportados'))
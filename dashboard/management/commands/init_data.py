@@ -60,28 +60,27 @@ class Command(BaseCommand):
     def create_platform_specs(self):
         """Crear especificaciones de plataforma en la base de datos."""
         self.stdout.write('Creando especificaciones de plataforma...')
-        
-        created_count = 0
-        
+
+        # Un solo INSERT; los duplicados se descartan gracias al
+        # unique_together de (platform, asset_key)
+        specs_to_create = [
+            PlatformSpec(
+                platform=platform_key,
+                asset_key=asset_key,
+                specifications=dict(specs),
+                is_active=True
+            )
+            for platform_key, platform_specs in PLATFORM_SPECS.items()
+            for asset_key, specs in platform_specs.items()
+        ]
+
+        existing_count = PlatformSpec.objects.count()
         with transaction.atomic():
-            for platform_key, platform_specs in PLATFORM_SPECS.items():
-                for asset_key, specs in platform_specs.items():
-                    # Verificar si ya existe
-                    if PlatformSpec.objects.filter(
-                        platform=platform_key, 
-                        asset_key=asset_key
-                    ).exists():
-                        continue
-                    
-                    # Crear especificación
-                    PlatformSpec.objects.create(
-                        platform=platform_key,
-                        asset_key=asset_key,
-                        specifications=specs,
-                        is_active=True
-                    )
-                    created_count += 1
-        
+            PlatformSpec.objects.bulk_create(
+                specs_to_create, ignore_conflicts=True, batch_size=500
+            )
+        created_count = PlatformSpec.objects.count() - existing_count
+
         self.stdout.write(
             self.style.SUCCESS(f'Creadas {created_count} especificaciones de plataforma')
         )
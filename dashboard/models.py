@@ -1,9 +1,17 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models, transaction
+from django.db.models import Count, ExpressionWrapper, F, FloatField, IntegerField, Q, Subquery, Value
+from django.db.models.functions import Coalesce, NullIf
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from django.utils.functional import cached_property
+from functools import lru_cache
 import hashlib
 import json
+from .cache import invalidate_dashboard_stats
 from .constants import (
     UserRole, MaterialType, MaterialStatus, Platform, ProjectStatus, AuditAction
 )
@@ -40,18 +48,39 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
     
-    @property
+    # cached_property: el rol no cambia durante la vida del request, así que
+    # cada comprobación de permisos paga la comparación una sola vez.
+    @cached_property
     def is_admin(self):
         return self.role == UserRole.ADMIN
-    
-    @property
+
+    @cached_property
     def is_reviewer(self):
         return self.role == UserRole.REVIEWER
-    
-    @property
+
+    @cached_property
     def is_client(self):
         return self.role == UserRole.CLIENT
 
+class ProjectQuerySet(models.QuerySet):
+    """QuerySet con agregados precalculados para proyectos."""
+
+    def with_completion(self):
+        """Anota el porcentaje de completado en una sola consulta SQL."""
+        return self.annotate(
+            total_count=Count('materials', distinct=True),
+            approved_count=Count(
+                'materials',
+                filter=Q(materials__status=MaterialStatus.APPROVED),
+                distinct=True,
+            ),
+        ).annotate(
+            completion=ExpressionWrapper(
+                100.0 * F('approved_count') / NullIf(F('total_count'), 0),
+                output_field=FloatField(),
+            )
+        )
+
 class Project(models.Model):
     """
     Proyecto que agrupa materiales para una app específica.
@@ -96,13 +125,30 @@ class Project(models.Model):
         blank=True,
         help_text="Revisores asignados al proyecto"
     )
+    total_materials = models.PositiveIntegerField(
+        default=0,
+        help_text="Contador denormalizado de materiales del proyecto"
+    )
+    approved_materials = models.PositiveIntegerField(
+        default=0,
+        help_text="Contador denormalizado de materiales aprobados"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    
+
+    objects = ProjectQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Proyecto"
         verbose_name_plural = "Proyectos"
         ordering = ['-created_at']
+        indexes = [
+            # Cubre el cursor de paginación (-created_at, -id)
+            models.Index(fields=['-created_at', '-id']),
+            # Cubre el conteo de proyectos vencidos del dashboard
+            # (status IN (...) AND deadline < now)
+            models.Index(fields=['status', 'deadline'], name='proj_status_deadline_idx'),
+        ]
     
     def __str__(self):
         return f"{self.company} - {self.app_name}"
@@ -113,14 +159,20 @@ class Project(models.Model):
             return False
         return timezone.now() > self.deadline
     
-    @property
+    @cached_property
     def completion_percentage(self):
-        """Calcula el porcentaje de completado basado en materiales aprobados."""
-        total_materials = self.materials.count()
-        if total_materials == 0:
+        """Calcula el porcentaje de completado basado en materiales aprobados.
+
+        cached_property: el changeform del admin y los serializers lo leen
+        varias veces por render; el cálculo se comparte por instancia.
+        """
+        # Si el queryset fue anotado con with_completion(), usar el agregado exacto
+        if hasattr(self, 'total_count'):
+            return round(self.completion or 0, 2)
+        # Contadores denormalizados mantenidos por señales: sin consultas
+        if self.total_materials == 0:
             return 0
-        approved_materials = self.materials.filter(status=MaterialStatus.APPROVED).count()
-        return round((approved_materials / total_materials) * 100, 2)
+        return round((self.approved_materials / self.total_materials) * 100, 2)
 
 class PlatformSpec(models.Model):
     """
@@ -150,10 +202,45 @@ class PlatformSpec(models.Model):
         verbose_name_plural = "Especificaciones de Plataforma"
         unique_together = ['platform', 'asset_key']
         ordering = ['platform', 'asset_key']
-    
+        indexes = [
+            GinIndex(fields=['specifications'], name='platformspec_specs_gin'),
+            # Cubre el lookup caliente de _get_platform_spec_cached
+            # (platform, asset_key, is_active) con un index seek
+            models.Index(fields=['platform', 'asset_key', 'is_active'], name='platformspec_lookup_idx'),
+        ]
+
     def __str__(self):
         return f"{self.get_platform_display()} - {self.asset_key}"
 
+    # Versión del caché de especificaciones; se incrementa en cada
+    # alta/edición/borrado para invalidar las entradas memoizadas
+    _VERSION = 0
+
+    @classmethod
+    def get_spec_cached(cls, platform, asset_key, version=None):
+        """Resuelve las especificaciones sin repetir la consulta a la BD.
+
+        El resultado se memoiza por (platform, asset_key, versión); la
+        versión cambia cuando alguna especificación se modifica.
+        """
+        if version is None:
+            version = cls._VERSION
+        return _get_platform_spec_cached(platform, asset_key, version)
+
+@lru_cache(maxsize=256)
+def _get_platform_spec_cached(platform, asset_key, version):
+    return (
+        PlatformSpec.objects
+        .filter(platform=platform, asset_key=asset_key, is_active=True)
+        .values_list('specifications', flat=True)
+        .first()
+    )
+
+@receiver(post_save, sender=PlatformSpec)
+@receiver(post_delete, sender=PlatformSpec)
+def _bump_platform_spec_cache_version(sender, **kwargs):
+    PlatformSpec._VERSION += 1
+
 class Material(models.Model):
     """
     Material (documento o imagen) para publicación en tiendas.
@@ -185,9 +272,10 @@ class Material(models.Model):
     file_size = models.PositiveIntegerField(
         help_text="Tamaño del archivo en bytes"
     )
-    file_hash = models.CharField(
-        max_length=64,
-        help_text="Hash SHA-256 del archivo"
+    file_hash = models.BinaryField(
+        max_length=32,
+        db_index=True,
+        help_text="Digest SHA-256 del archivo (32 bytes)"
     )
     mime_type = models.CharField(
         max_length=100,
@@ -237,19 +325,38 @@ class Material(models.Model):
         verbose_name_plural = "Materiales"
         ordering = ['-created_at']
         unique_together = ['project', 'platform', 'asset_key']
+        indexes = [
+            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['platform', 'asset_key']),
+            models.Index(fields=['project', '-created_at']),
+            models.Index(fields=['project', 'status']),
+            # Cubre el cursor de paginación (-created_at, -id)
+            models.Index(fields=['-created_at', '-id']),
+        ]
     
     def __str__(self):
         return f"{self.project.app_name} - {self.get_platform_display()} - {self.asset_key}"
     
     def calculate_file_hash(self, file_content):
-        """Calcula el hash SHA-256 del contenido del archivo."""
-        return hashlib.sha256(file_content).hexdigest()
-    
+        """Calcula el digest SHA-256 del contenido del archivo.
+
+        Acepta bytes o un objeto tipo archivo; en el segundo caso el hash
+        se calcula por streaming sin cargar el archivo completo en memoria.
+        """
+        if hasattr(file_content, 'read'):
+            return hashlib.file_digest(file_content, 'sha256').digest()
+        return hashlib.sha256(file_content).digest()
+
     @property
+    def hash_hex(self):
+        """Representación hexadecimal del hash para API y admin."""
+        return bytes(self.file_hash).hex() if self.file_hash else ''
+
+    @cached_property
     def file_size_mb(self):
         """Retorna el tamaño del archivo en MB."""
         return round(self.file_size / (1024 * 1024), 2)
-    
+
     @property
     def is_image(self):
         return self.material_type == MaterialType.IMAGE
@@ -258,6 +365,49 @@ class Material(models.Model):
     def is_document(self):
         return self.material_type == MaterialType.DOCUMENT
 
+@receiver(pre_save, sender=Material)
+def _capture_material_old_status(sender, instance, **kwargs):
+    """Guarda el estado previo para poder ajustar los contadores del proyecto."""
+    if instance.pk:
+        instance._old_status = (
+            Material.objects.filter(pk=instance.pk)
+            .values_list('status', flat=True)
+            .first()
+        )
+    else:
+        instance._old_status = None
+
+@receiver(post_save, sender=Material)
+def _update_project_counters_on_save(sender, instance, created, **kwargs):
+    """Mantiene los contadores denormalizados de Project con updates atómicos."""
+    if created:
+        approved_delta = 1 if instance.status == MaterialStatus.APPROVED else 0
+        Project.objects.filter(pk=instance.project_id).update(
+            total_materials=F('total_materials') + 1,
+            approved_materials=F('approved_materials') + approved_delta,
+        )
+        return
+
+    old_status = getattr(instance, '_old_status', None)
+    if old_status == instance.status:
+        return
+    if instance.status == MaterialStatus.APPROVED:
+        Project.objects.filter(pk=instance.project_id).update(
+            approved_materials=F('approved_materials') + 1
+        )
+    elif old_status == MaterialStatus.APPROVED:
+        Project.objects.filter(pk=instance.project_id).update(
+            approved_materials=F('approved_materials') - 1
+        )
+
+@receiver(post_delete, sender=Material)
+def _update_project_counters_on_delete(sender, instance, **kwargs):
+    approved_delta = 1 if instance.status == MaterialStatus.APPROVED else 0
+    Project.objects.filter(pk=instance.project_id).update(
+        total_materials=F('total_materials') - 1,
+        approved_materials=F('approved_materials') - approved_delta,
+    )
+
 class MaterialVersion(models.Model):
     """
     Versión de un material para control de versiones.
@@ -269,7 +419,8 @@ class MaterialVersion(models.Model):
         help_text="Material al que pertenece esta versión"
     )
     version_number = models.PositiveIntegerField(
-        help_text="Número de versión"
+        blank=True,
+        help_text="Número de versión (se asigna automáticamente si se omite)"
     )
     file_name = models.CharField(
         max_length=255,
@@ -278,9 +429,10 @@ class MaterialVersion(models.Model):
     file_size = models.PositiveIntegerField(
         help_text="Tamaño del archivo en bytes"
     )
-    file_hash = models.CharField(
-        max_length=64,
-        help_text="Hash SHA-256 del archivo"
+    file_hash = models.BinaryField(
+        max_length=32,
+        db_index=True,
+        help_text="Digest SHA-256 del archivo (32 bytes)"
     )
     mime_type = models.CharField(
         max_length=100,
@@ -326,8 +478,33 @@ class MaterialVersion(models.Model):
     
     def __str__(self):
         return f"{self.material} - v{self.version_number}"
-    
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.version_number is None:
+            # El siguiente número se resuelve dentro del propio INSERT con
+            # una subconsulta, sin SELECT previo; el unique_together
+            # (material, version_number) protege contra carreras.
+            self.version_number = Coalesce(
+                Subquery(
+                    MaterialVersion.objects
+                    .filter(material_id=self.material_id)
+                    .order_by('-version_number')
+                    .values('version_number')[:1]
+                ),
+                Value(0),
+                output_field=IntegerField(),
+            ) + Value(1)
+            super().save(*args, **kwargs)
+            self.refresh_from_db(fields=['version_number'])
+            return
+        super().save(*args, **kwargs)
+
     @property
+    def hash_hex(self):
+        """Representación hexadecimal del hash para API y admin."""
+        return bytes(self.file_hash).hex() if self.file_hash else ''
+
+    @cached_property
     def file_size_mb(self):
         """Retorna el tamaño del archivo en MB."""
         return round(self.file_size / (1024 * 1024), 2)
@@ -372,30 +549,72 @@ class Approval(models.Model):
         verbose_name_plural = "Aprobaciones"
         ordering = ['-created_at']
         unique_together = ['material', 'reviewer']
+        indexes = [
+            models.Index(fields=['status', '-created_at']),
+            # Cubre el cursor de paginación (-created_at, -id)
+            models.Index(fields=['-created_at', '-id']),
+        ]
     
     def __str__(self):
         return f"{self.material} - {self.reviewer.username}"
     
     def approve(self, comments=""):
         """Aprueba el material."""
-        self.status = MaterialStatus.APPROVED
-        self.comments = comments
-        self.approved_at = timezone.now()
-        self.save()
-        
-        # Actualizar el estado del material
-        self.material.status = MaterialStatus.APPROVED
-        self.material.save()
-    
+        self._resolve(MaterialStatus.APPROVED, comments, approved=True)
+
     def reject(self, comments=""):
         """Rechaza el material."""
-        self.status = MaterialStatus.NEEDS_CORRECTION
+        self._resolve(MaterialStatus.NEEDS_CORRECTION, comments)
+
+    def _resolve(self, new_status, comments, approved=False):
+        """Aplica la resolución con dos UPDATEs acotados en una transacción.
+
+        Evita los save() completos (cada uno reescribe todas las columnas y
+        dispara señales); como los UPDATE de queryset no pasan por las
+        señales, el contador denormalizado del proyecto se ajusta aquí.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            type(self).objects.filter(pk=self.pk).update(
+                status=new_status,
+                comments=comments,
+                approved_at=now if approved else None,
+                updated_at=now,
+            )
+            old_material_status = (
+                Material.objects.filter(pk=self.material_id)
+                .values_list('status', flat=True)
+                .first()
+            )
+            if old_material_status != new_status:
+                Material.objects.filter(pk=self.material_id).update(
+                    status=new_status,
+                    updated_at=now,
+                )
+                if new_status == MaterialStatus.APPROVED:
+                    delta = 1
+                elif old_material_status == MaterialStatus.APPROVED:
+                    delta = -1
+                else:
+                    delta = 0
+                if delta:
+                    Project.objects.filter(
+                        materials__pk=self.material_id
+                    ).update(approved_materials=F('approved_materials') + delta)
+            # El dashboard agrega por estado de materiales y aprobaciones:
+            # invalidar su caché recién cuando el cambio sea visible
+            transaction.on_commit(invalidate_dashboard_stats)
+
+        # Reflejar el nuevo estado en las instancias en memoria para que
+        # la respuesta serializada no requiera un refresh_from_db().
+        self.status = new_status
         self.comments = comments
-        self.save()
-        
-        # Actualizar el estado del material
-        self.material.status = MaterialStatus.NEEDS_CORRECTION
-        self.material.save()
+        self.approved_at = now if approved else None
+        self.updated_at = now
+        material = self._state.fields_cache.get('material')
+        if material is not None:
+            material.status = new_status
+            material.updated_at = now
 
 class DriveLink(models.Model):
     """
@@ -497,6 +716,7 @@ class AuditLog(models.Model):
             models.Index(fields=['action', 'created_at']),
             models.Index(fields=['actor', 'created_at']),
             models.Index(fields=['entity_type', 'entity_id']),
+            GinIndex(fields=['payload'], name='auditlog_payload_gin'),
         ]
     
     def __str__(self):
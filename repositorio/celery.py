@@ -0,0 +1,17 @@
+"""
+Configuración de Celery para el proyecto repositorio.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'repositorio.settings')
+
+app = Celery('repositorio')
+
+# Toda la configuración CELERY_* sale de settings.py
+app.config_from_object('django.conf:settings', namespace='CELERY')
+
+# Descubrir tasks.py en las apps instaladas
+app.autodiscover_tasks()
@@ -152,6 +152,9 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Custom user model
+AUTH_USER_MODEL = 'dashboard.User'
+
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -218,6 +221,19 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Auth Settings
+# Con True el login itera los AUTHENTICATION_BACKENDS configurados;
+# por defecto hace un fetch directo del usuario (solo ModelBackend).
+LOGIN_USE_AUTH_BACKENDS = config('LOGIN_USE_AUTH_BACKENDS', default=False, cast=bool)
+
+# Audit Log Settings
+# Con True los logs de auditoría se insertan en línea en el request;
+# por defecto se escriben en lotes desde un hilo de fondo.
+AUDIT_LOG_SYNC = config('AUDIT_LOG_SYNC', default=False, cast=bool)
+# Con True la escritura se delega a un worker de Celery (cola 'audit')
+# en lugar del hilo de fondo; requiere broker y workers corriendo.
+AUDIT_LOG_USE_CELERY = config('AUDIT_LOG_USE_CELERY', default=False, cast=bool)
+
 # File Upload Settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
@@ -225,6 +241,9 @@ FILE_UPLOAD_PERMISSIONS = 0o644
 
 # Image Processing Settings
 PILLOW_MAX_IMAGE_PIXELS = 178956970  # 178 megapixels
+# Con False se omite Image.verify() en la validación de rasters
+# (la decodificación posterior ya falla con archivos corruptos)
+STRICT_IMAGE_VERIFY = config('STRICT_IMAGE_VERIFY', default=True, cast=bool)
 
 # Google Drive API Settings
 GOOGLE_DRIVE_CREDENTIALS_FILE = config('GOOGLE_DRIVE_CREDENTIALS_FILE', default='')